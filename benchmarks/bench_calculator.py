@@ -0,0 +1,173 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import calc_engine
+import calc_history
+from calc_functions import default_registry
+
+SHORT_EXPRESSION = "2+3*4-5/2"
+
+# "((((1+2)*3-4)/5+6)*...)" with `depth` levels of parentheses
+def nested_expression(depth):
+    expression = "1"
+    for i in range(depth):
+        expression = f"({expression}{'+-*/'[i % 4]}{i % 9 + 1})"
+    return expression
+
+# Time `func` once per iteration; `setup` runs untimed before each call
+def measure(func, iterations, setup=None):
+    latencies = []
+    for _ in range(iterations):
+        if setup:
+            setup()
+        started = time.perf_counter_ns()
+        func()
+        latencies.append(time.perf_counter_ns() - started)
+
+    # Separate, shorter pass for memory so tracemalloc does not skew the timings
+    tracemalloc.start()
+    for _ in range(max(1, iterations // 10)):
+        if setup:
+            setup()
+        func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencies.sort()
+    total = sum(latencies) / 1e9
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] / 1e3
+    return {
+        "iterations": iterations,
+        "ops_per_sec": iterations / total if total else float("inf"),
+        "p50_us": percentile(0.50),
+        "p95_us": percentile(0.95),
+        "p99_us": percentile(0.99),
+        "mean_us": statistics.fmean(latencies) / 1e3,
+        "peak_memory_bytes": peak,
+    }
+
+# Write a journal with `count` entries directly, without going through append()
+def build_journal(path, count):
+    with open(path, "wb") as f:
+        f.write(calc_history.MAGIC)
+        for i in range(count):
+            f.write(calc_history.encode_record(f"{i}*{i % 97}+{i % 13} = {i * (i % 97) + i % 13}"))
+
+def expression_cases(iterations):
+    cache = calc_engine.ExpressionCache()
+    cases = {}
+    for label, expression in [("short", SHORT_EXPRESSION), ("nested_20", nested_expression(20)),
+                              ("nested_100", nested_expression(100))]:
+        cases[f"calculate_{label}_cold"] = measure(lambda: calc_engine.calculate(expression, cache),
+                                                   iterations, setup=cache.clear)
+        calc_engine.calculate(expression, cache)
+        cases[f"calculate_{label}_warm"] = measure(lambda: calc_engine.calculate(expression, cache), iterations)
+    return cases
+
+def function_cases(iterations):
+    cases = {}
+    for name in ("sin", "ln", "√"):
+        cases[f"function_{name}_cold"] = measure(lambda: calc_engine.apply_function(name, 30.0), iterations,
+                                                 setup=default_registry.clear_cache)
+        cases[f"function_{name}_warm"] = measure(lambda: calc_engine.apply_function(name, 30.0), iterations)
+    return cases
+
+def history_cases(sizes, workdir):
+    cases = {}
+    path = os.path.join(workdir, "append.journal")
+    journal = calc_history.HistoryJournal(path, compact_interval=1e9)
+    cases["history_append"] = measure(lambda: journal.append("12+34 = 46"), 10000)
+    journal.close()
+
+    for size in sizes:
+        path = os.path.join(workdir, f"history_{size}.journal")
+        build_journal(path, size)
+        def open_tail():
+            calc_history.HistoryJournal(path, max_entries=size, compact_interval=1e9).close()
+        def load_all():
+            journal = calc_history.HistoryJournal(path, max_entries=size, compact_interval=1e9)
+            journal.load_all()
+            journal.close()
+        cases[f"history_open_{size}"] = measure(open_tail, 20)
+        cases[f"history_load_all_{size}"] = measure(load_all, 3)
+        journal = calc_history.HistoryJournal(path, max_entries=size, compact_interval=1e9)
+        index = calc_history.HistoryIndex()
+        index.extend(journal.load_all())
+        journal.close()
+        cases[f"history_search_{size}"] = measure(lambda: index.search("97+"), 50)
+    return cases
+
+# Print cases that got slower than the baseline by more than `threshold`
+def compare(results, baseline_path, threshold):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    regressions = 0
+    for name, current in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        change = current["p50_us"] / previous["p50_us"] - 1 if previous["p50_us"] else 0.0
+        flag = "REGRESSION" if change > threshold else ""
+        regressions += bool(flag)
+        print(f"{name:<36}{previous['p50_us']:>12.2f}{current['p50_us']:>12.2f}{change:>+10.1%}  {flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the calculator evaluation core and history journal.")
+    parser.add_argument("-n", "--iterations", type=int, default=5000, help="Iterations per expression/function case")
+    parser.add_argument("--history-sizes", default="10000,100000,1000000",
+                        help="Comma-separated history sizes to benchmark")
+    parser.add_argument("-o", "--output", default=os.path.join(tempfile.gettempdir(), "calc_bench_output.json"),
+                        help="Where to write JSON results (default: the system temp directory)")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier run to compare median latencies against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.history_sizes.split(",") if size]
+    workdir = tempfile.mkdtemp(prefix="calc_bench_")
+    try:
+        results = {}
+        results.update(expression_cases(args.iterations))
+        results.update(function_cases(args.iterations))
+        results.update(history_cases(sizes, workdir))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{'case':<36}{'ops/s':>12}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}{'peak KiB':>10}")
+    for name, r in results.items():
+        print(f"{name:<36}{r['ops_per_sec']:>12.0f}{r['p50_us']:>10.1f}{r['p95_us']:>10.1f}"
+              f"{r['p99_us']:>10.1f}{r['peak_memory_bytes'] / 1024:>10.1f}")
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "history_sizes": sizes,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        print()
+        print(f"{'case':<36}{'base p50':>12}{'now p50':>12}{'change':>10}")
+        if compare(results, args.compare, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import calc_engine
+
+# Expressions that qualify for exact mode, and ones that stay on the float path
+EXACT_EXPRESSIONS = ["0.1+0.2", "19.99*3-0.01", "1250.75-99.99+0.05", "(0.1+0.7)*10/3"]
+FLOAT_EXPRESSIONS = ["2+3*4", "sin(30)+2", "2**10-1", "sqrt(16)/3"]
+
+# Time `func` and return microseconds per call
+def time_call(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the float and exact evaluation paths of calc_engine.")
+    parser.add_argument("-n", "--number", type=int, default=20000, help="Calls per timing run")
+    args = parser.parse_args(argv)
+
+    print(f"{'expression':<22}{'float':>10}{'decimal':>10}{'fraction':>10}   (us/call, warm cache)")
+    for expression in EXACT_EXPRESSIONS:
+        compiled = calc_engine.compile_expression(expression)
+        timings = [time_call(compiled.evaluate, args.number)]
+        for mode in ('decimal', 'fraction'):
+            timings.append(time_call(lambda: compiled.evaluate_exact(mode), args.number))
+        print(f"{expression:<22}" + "".join(f"{t:>10.2f}" for t in timings))
+
+    # With exact mode switched on, expressions that do not need it should cost
+    # the same as plain float evaluation.
+    print()
+    print(f"{'expression':<22}{'off':>10}{'decimal':>10}   (us/call through calculate())")
+    for expression in EXACT_EXPRESSIONS + FLOAT_EXPRESSIONS:
+        off = time_call(lambda: calc_engine.calculate(expression), args.number)
+        on = time_call(lambda: calc_engine.calculate(expression, exact='decimal'), args.number)
+        print(f"{expression:<22}{off:>10.2f}{on:>10.2f}")
+
+if __name__ == "__main__":
+    main()
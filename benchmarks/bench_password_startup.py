@@ -0,0 +1,48 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What importing password_gen used to cost before anything was generated:
+# Tk, the stray turtle import, the eager cryptography import and friends
+OLD_IMPORTS = ("import tkinter, turtle, difflib, hashlib, secrets, string\n"
+               "try:\n"
+               "    import cryptography.fernet\n"
+               "except ImportError:\n"
+               "    pass\n")
+
+# Median wall time of a fresh interpreter running `command`
+def time_command(command, runs, cwd):
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=cwd, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare `password_cli.py generate` startup with the old eager imports.")
+    parser.add_argument("-n", "--runs", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    # Run in a scratch directory so no vault or key file is created or read
+    cwd = tempfile.mkdtemp()
+    baseline = time_command([sys.executable, "-c", "pass"], args.runs, cwd)
+    old = time_command([sys.executable, "-c", OLD_IMPORTS], args.runs, cwd)
+    cli = time_command([sys.executable, os.path.join(ROOT, "password_cli.py"), "generate", "-n", "1"], args.runs, cwd)
+    core = time_command([sys.executable, "-c", f"import sys; sys.path.insert(0, {ROOT!r}); import password_core"],
+                        args.runs, cwd)
+
+    print(f"interpreter only:              {baseline * 1000:7.1f} ms")
+    print(f"old password_gen imports:      {old * 1000:7.1f} ms")
+    print(f"import password_core:          {core * 1000:7.1f} ms")
+    print(f"password_cli.py generate -n 1: {cli * 1000:7.1f} ms")
+    print(f"generate startup over the interpreter: {(cli - baseline) / max(old - baseline, 1e-9):.0%} of the old imports alone")
+
+if __name__ == "__main__":
+    main()
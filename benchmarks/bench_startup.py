@@ -0,0 +1,58 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import calculator
+
+# Count Toplevel windows below a widget
+def count_toplevels(widget):
+    return sum(isinstance(child, tk.Toplevel) + count_toplevels(child) for child in widget.winfo_children())
+
+# Cost of the previous approach: one hidden Toplevel per button for its tooltip
+def per_button_toplevels(root, count):
+    started = time.perf_counter()
+    windows = []
+    for _ in range(count):
+        tooltip = tk.Toplevel(root)
+        tooltip.withdraw()
+        tooltip.overrideredirect(True)
+        tk.Label(tooltip, text="tooltip", font=("Arial", 8), bg="yellow", relief="solid", bd=1).pack()
+        windows.append(tooltip)
+    root.update_idletasks()
+    elapsed = time.perf_counter() - started
+    for window in windows:
+        window.destroy()
+    return elapsed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure EnhancedCalculator construction time (needs a display).")
+    parser.add_argument("-n", "--runs", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    # Run in a scratch directory so the real history journal is not touched
+    os.chdir(tempfile.mkdtemp())
+    startup, toplevels, old_tooltips = [], [], []
+    for _ in range(args.runs):
+        root = tk.Tk()
+        root.withdraw()
+        app = calculator.EnhancedCalculator(root)
+        root.update_idletasks()
+        startup.append(app.startup_time)
+        toplevels.append(count_toplevels(root))
+        buttons = sum(isinstance(child, tk.Button) for child in root.winfo_children())
+        old_tooltips.append(per_button_toplevels(root, buttons))
+        app.history.close()
+        root.destroy()
+
+    print(f"construction:  median {statistics.median(startup) * 1000:.1f} ms over {args.runs} runs")
+    print(f"toplevels created at startup: {max(toplevels)}")
+    print(f"per-button tooltip windows would add: median {statistics.median(old_tooltips) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
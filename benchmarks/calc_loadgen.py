@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from calc_client import AsyncCalculatorClient
+from calc_server import DEFAULT_SOCKET
+
+EXPRESSIONS = ["2+3*4", "sin(30)+2", "(1.5+2.5)*4/3", "2**10-1", "sqrt(16)+ln(10)", "nCr(10,3)*0.5"]
+
+# One connection sending `requests` requests with up to `depth` in flight
+async def run_client(path, requests, depth, batch, latencies):
+    client = await AsyncCalculatorClient.connect(path)
+    slots = asyncio.Semaphore(depth)
+
+    async def one():
+        async with slots:
+            started = time.perf_counter()
+            if batch > 1:
+                await client.calculate_many(random.choices(EXPRESSIONS, k=batch))
+            else:
+                await client.request({"expr": random.choice(EXPRESSIONS)})
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    await client.close()
+
+async def run(args):
+    latencies = []
+    started = time.perf_counter()
+    await asyncio.gather(*(run_client(args.socket, args.requests, args.depth, args.batch, latencies)
+                           for _ in range(args.clients)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    total = args.clients * args.requests
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    print(f"{args.clients} clients x {args.requests} requests (depth {args.depth}, batch {args.batch})")
+    print(f"requests/sec:    {total / elapsed:,.0f}")
+    print(f"expressions/sec: {total * args.batch / elapsed:,.0f}")
+    print(f"latency ms:      p50 {percentile(0.5):.2f}  p95 {percentile(0.95):.2f}  p99 {percentile(0.99):.2f}")
+
+def connectable(path):
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate load against the calculator service.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument("-c", "--clients", type=int, default=50, help="Concurrent connections")
+    parser.add_argument("-n", "--requests", type=int, default=1000, help="Requests per client")
+    parser.add_argument("-d", "--depth", type=int, default=8, help="Pipelined requests in flight per client")
+    parser.add_argument("-b", "--batch", type=int, default=1, help="Expressions per request")
+    parser.add_argument("--spawn", action="store_true", help="Start a server for the duration of the run")
+    parser.add_argument("--spawn-timeout", type=float, default=10.0, help="Seconds to wait for a spawned server")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.spawn:
+        if connectable(args.socket):
+            sys.exit(f"Error: a server is already listening on {args.socket}")
+        server = subprocess.Popen([sys.executable, os.path.join(ROOT, "calc_server.py"), "--socket", args.socket],
+                                  stdout=subprocess.DEVNULL)
+        deadline = time.monotonic() + args.spawn_timeout
+        while not connectable(args.socket):
+            if server.poll() is not None:
+                sys.exit(f"Error: the server exited with status {server.returncode}")
+            if time.monotonic() > deadline:
+                server.kill()
+                server.wait()
+                sys.exit(f"Error: the server did not start listening within {args.spawn_timeout:g}s")
+            time.sleep(0.05)
+    try:
+        asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import os
+import sys
+from functools import partial
+from itertools import islice
+from multiprocessing import Pool
+
+import calc_engine
+
+# Evaluate a single input line; errors are reported in place of the result
+def evaluate_line(line):
+    expression = line.strip()
+    if not expression:
+        return ""
+    try:
+        return str(calc_engine.calculate(expression))
+    except Exception as e:
+        return f"Error: {str(e) or type(e).__name__}"
+
+# Work unit handed to a pool worker
+def evaluate_chunk(lines, echo=False):
+    if echo:
+        return [f"{line.strip()} = {evaluate_line(line)}" if line.strip() else "" for line in lines]
+    return [evaluate_line(line) for line in lines]
+
+# Group an iterable into lists of at most size items
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+# Yield result chunks in input order.
+# Only a bounded window of chunks is in flight at once, so arbitrarily large
+# inputs stream through with constant memory.
+def evaluate_stream(lines, workers=None, chunk_size=1000, echo=False):
+    workers = workers or os.cpu_count() or 1
+    work = partial(evaluate_chunk, echo=echo)
+    chunks = batched(lines, chunk_size)
+    if workers == 1:
+        for chunk in chunks:
+            yield work(chunk)
+        return
+    with Pool(workers) as pool:
+        for window in batched(chunks, workers * 4):
+            yield from pool.imap(work, window)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate calculator expressions in batch, one per line.")
+    parser.add_argument("input", nargs="?", default="-", help="File of expressions (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="Output file (default: stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count, 1 disables the pool)")
+    parser.add_argument("-c", "--chunk-size", type=int, default=1000, help="Lines per work unit")
+    parser.add_argument("--echo", action="store_true", help="Write 'expression = result' instead of just the result")
+    args = parser.parse_args(argv)
+
+    infile = sys.stdin if args.input == "-" else open(args.input, 'r')
+    outfile = sys.stdout if args.output == "-" else open(args.output, 'w')
+    try:
+        lines = (line.rstrip("\n") for line in infile)
+        for results in evaluate_stream(lines, args.workers, args.chunk_size, args.echo):
+            outfile.write("".join(f"{result}\n" for result in results))
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+        if outfile is not sys.stdout:
+            outfile.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import asyncio
+import itertools
+import json
+import socket
+
+from calc_server import DEFAULT_SOCKET
+
+
+class CalculatorError(Exception):
+    pass
+
+
+def _unwrap(response):
+    if "error" in response:
+        raise CalculatorError(response["error"])
+    return response["result"]
+
+
+# Blocking client, one request at a time
+class CalculatorClient:
+    def __init__(self, path=DEFAULT_SOCKET, timeout=5.0):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path)
+        self.file = self.sock.makefile("rb")
+        self.ids = itertools.count()
+
+    def request(self, payload):
+        payload = dict(payload, id=next(self.ids))
+        self.sock.sendall(json.dumps(payload).encode() + b"\n")
+        while True:
+            line = self.file.readline()
+            if not line:
+                raise ConnectionError("Calculator service closed the connection")
+            response = json.loads(line)
+            if response.get("id") == payload["id"]:
+                return response
+
+    def calculate(self, expression, exact=None):
+        return _unwrap(self.request({"expr": expression, "exact": exact}))
+
+    def apply_function(self, name, value):
+        return _unwrap(self.request({"function": name, "value": value}))
+
+    # Evaluate many expressions in one round trip; failed items come back as CalculatorError instances
+    def calculate_many(self, expressions, exact=None):
+        response = self.request({"batch": [{"expr": e, "exact": exact} for e in expressions]})
+        if "error" in response:
+            raise CalculatorError(response["error"])
+        return [CalculatorError(r["error"]) if "error" in r else r["result"] for r in response["results"]]
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# asyncio client that pipelines requests over one connection.
+# Responses can arrive out of order and are matched to callers by id.
+class AsyncCalculatorClient:
+    def __init__(self):
+        self.reader = None
+        self.writer = None
+        self.waiting = {}
+        self.ids = itertools.count()
+        self.reader_task = None
+
+    @classmethod
+    async def connect(cls, path=DEFAULT_SOCKET):
+        client = cls()
+        client.reader, client.writer = await asyncio.open_unix_connection(path, limit=1 << 20)
+        client.reader_task = asyncio.create_task(client._read_responses())
+        return client
+
+    async def _read_responses(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self.waiting.pop(response.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self.waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Calculator service closed the connection"))
+            self.waiting.clear()
+
+    async def request(self, payload):
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[request_id] = future
+        self.writer.write(json.dumps(dict(payload, id=request_id)).encode() + b"\n")
+        await self.writer.drain()
+        return await future
+
+    async def calculate(self, expression, exact=None):
+        return _unwrap(await self.request({"expr": expression, "exact": exact}))
+
+    async def calculate_many(self, expressions, exact=None):
+        response = await self.request({"batch": [{"expr": e, "exact": exact} for e in expressions]})
+        if "error" in response:
+            raise CalculatorError(response["error"])
+        return [CalculatorError(r["error"]) if "error" in r else r["result"] for r in response["results"]]
+
+    async def close(self):
+        self.writer.close()
+        self.reader_task.cancel()
@@ -0,0 +1,431 @@
+import bisect
+import math
+import re
+import threading
+from collections import OrderedDict
+from decimal import Decimal, localcontext
+from fractions import Fraction
+
+from calc_functions import default_registry
+
+# Token kinds produced by the tokenizer
+NUMBER, OP, NAME, LPAREN, RPAREN, COMMA = "num", "op", "name", "(", ")", ","
+
+TOKEN_PATTERN = re.compile(r"\s*(?:(\d+\.?\d*|\.\d+)|(\*\*|[-+*/^])|([A-Za-z_]\w*)|([(),]))")
+
+# Number types for exact mode, and the instructions they evaluate exactly
+EXACT_TYPES = {'decimal': Decimal, 'fraction': Fraction}
+EXACT_OPS = {'const', 'add', 'sub', 'mul', 'div', 'neg'}
+
+MAX_POWER_BITS = 1 << 16  # Largest exact power computed, estimated as exponent * log2(base)
+
+BINARY_OPS = {
+    '+': 'add',
+    '-': 'sub',
+    '*': 'mul',
+    '/': 'div',
+    '**': 'pow',
+    '^': 'pow',
+}
+
+
+class ExpressionError(ValueError):
+    pass
+
+
+# Split an expression into (kind, text) tokens in a single pass
+def tokenize(expression):
+    return scan(expression)[0]
+
+
+# Tokenize from `pos`, also returning the end offset of every token
+def scan(expression, pos=0):
+    tokens = []
+    ends = []
+    end = len(expression.rstrip())
+    while pos < end:
+        match = TOKEN_PATTERN.match(expression, pos)
+        if not match:
+            raise ExpressionError(f"Unexpected character {expression[pos]!r} at position {pos}")
+        number, op, name, punctuation = match.groups()
+        if number is not None:
+            tokens.append((NUMBER, number))
+        elif op is not None:
+            tokens.append((OP, op))
+        elif name is not None:
+            tokens.append((NAME, name))
+        else:
+            tokens.append((punctuation, punctuation))
+        pos = match.end()
+        ends.append(pos)
+    return tokens, ends
+
+
+# Tokenizer for text that changes a little at a time, such as the display
+# while typing. Tokens that end before the first edited character are reused
+# and only the edited tail is scanned again.
+class IncrementalTokenizer:
+    def __init__(self):
+        self.text = ""
+        self.tokens = []
+        self.ends = []
+
+    def tokenize(self, expression):
+        unchanged = common_prefix_length(self.text, expression)
+        # A token ending exactly at the edit could grow (12 -> 123), so rescan it too
+        keep = bisect.bisect_left(self.ends, unchanged)
+        start = self.ends[keep - 1] if keep else 0
+        tail_tokens, tail_ends = scan(expression, start)
+        self.text = expression
+        self.tokens = self.tokens[:keep] + tail_tokens
+        self.ends = self.ends[:keep] + tail_ends
+        return self.tokens
+
+
+# Length of the common prefix, found by bisecting on slice comparisons
+def common_prefix_length(a, b):
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+# Recursive-descent parser that emits a postfix program.
+# Precedence follows Python's eval: unary minus binds looser than "**".
+class Parser:
+    def __init__(self, tokens, registry=default_registry):
+        self.tokens = tokens
+        self.registry = registry
+        self.pos = 0
+        self.program = []
+
+    def peek(self):
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return (None, None)
+
+    def advance(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def expect(self, kind):
+        token = self.advance()
+        if token[0] != kind:
+            found = "end of expression" if token[0] is None else repr(token[1])
+            raise ExpressionError(f"Expected {kind!r} but found {found}")
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            raise ExpressionError("Empty expression")
+        self.parse_sum()
+        if self.pos != len(self.tokens):
+            raise ExpressionError(f"Unexpected token {self.peek()[1]!r}")
+        return tuple(self.program)
+
+    def parse_sum(self):
+        self.parse_product()
+        while self.peek() in ((OP, '+'), (OP, '-')):
+            op = self.advance()[1]
+            self.parse_product()
+            self.program.append((BINARY_OPS[op],))
+
+    def parse_product(self):
+        self.parse_unary()
+        while self.peek() in ((OP, '*'), (OP, '/')):
+            op = self.advance()[1]
+            self.parse_unary()
+            self.program.append((BINARY_OPS[op],))
+
+    def parse_unary(self):
+        if self.peek() == (OP, '-'):
+            self.advance()
+            self.parse_unary()
+            self.program.append(('neg',))
+        elif self.peek() == (OP, '+'):
+            self.advance()
+            self.parse_unary()
+        else:
+            self.parse_power()
+
+    def parse_power(self):
+        self.parse_atom()
+        if self.peek() in ((OP, '**'), (OP, '^')):
+            self.advance()
+            self.parse_unary()  # Right associative, and allows 2**-1
+            self.program.append(('pow',))
+
+    def parse_atom(self):
+        kind, text = self.advance()
+        if kind == NUMBER:
+            # The literal's text is kept so exact mode can read it without float rounding
+            value = float(text) if '.' in text else int(text)
+            self.program.append(('const', value, text))
+        elif kind == NAME:
+            if self.peek()[0] != LPAREN:
+                self.program.append(('var', text))  # Free variable, bound at evaluation time
+                return
+            if text not in self.registry:
+                raise ExpressionError(f"Unknown function {text!r}")
+            self.advance()
+            count = 1
+            self.parse_sum()
+            while self.peek()[0] == COMMA:
+                self.advance()
+                self.parse_sum()
+                count += 1
+            self.expect(RPAREN)
+            arity = self.registry.get(text).arity
+            if count != arity:
+                raise ExpressionError(f"{text} takes {arity} argument{'s' if arity != 1 else ''}, got {count}")
+            self.program.append(('call', text, count))
+        elif kind == LPAREN:
+            self.parse_sum()
+            self.expect(RPAREN)
+        elif kind is None:
+            raise ExpressionError("Unexpected end of expression")
+        else:
+            raise ExpressionError(f"Unexpected token {text!r}")
+
+
+# Run a compiled postfix program on a small value stack.
+# The operators work unchanged on NumPy arrays, so passing array variables and
+# an array-aware `call` evaluates the whole program in one vectorized pass.
+def run_program(program, variables=None, call=default_registry.call):
+    stack = []
+    slots = {}  # Shared sub-expression values, see optimize()
+    push, pop = stack.append, stack.pop
+    for instruction in program:
+        opcode = instruction[0]
+        if opcode == 'const':
+            push(instruction[1])
+        elif opcode == 'var':
+            name = instruction[1]
+            if not variables or name not in variables:
+                raise ExpressionError(f"Unknown variable {name!r}")
+            push(variables[name])
+        elif opcode == 'call':
+            count = instruction[2]
+            args = stack[-count:]
+            del stack[-count:]
+            push(call(instruction[1], *args))
+        elif opcode == 'store':
+            slots[instruction[1]] = stack[-1]
+        elif opcode == 'load':
+            push(slots[instruction[1]])
+        elif opcode == 'neg':
+            push(-pop())
+        else:
+            right = pop()
+            left = pop()
+            if opcode == 'add':
+                push(left + right)
+            elif opcode == 'sub':
+                push(left - right)
+            elif opcode == 'mul':
+                push(left * right)
+            elif opcode == 'div':
+                push(left / right)
+            else:
+                push(power(left, right))
+    return stack[0]
+
+
+# left ** right, refusing exact integer and fraction powers whose result would
+# be too large to compute in reasonable time (9**9**9). Float, Decimal and
+# array powers are bounded by their own types and pass straight through.
+def power(base, exponent):
+    if isinstance(exponent, int) and (isinstance(base, Fraction) or isinstance(base, int) and exponent > 0):
+        magnitude = max(abs(base.numerator), base.denominator)
+        if magnitude > 1 and abs(exponent) * math.log2(magnitude) > MAX_POWER_BITS:
+            raise ExpressionError("Result is too large")
+    return base ** exponent
+
+
+# Rewrite a postfix program so that constant sub-trees are folded into single
+# constants and identical sub-expressions are computed once. A repeated
+# sub-expression is computed at its first use, kept with 'store' and re-read
+# with 'load'. Sub-trees whose evaluation fails (1/0, ln(-1)...) are left
+# alone so the error still surfaces when the expression is evaluated.
+def optimize(program, call=default_registry.call):
+    nodes = []  # (opcode, argument, child node ids)
+    interned = {}
+    stack = []
+    for instruction in program:
+        opcode = instruction[0]
+        if opcode in ('const', 'var'):
+            node = (opcode, instruction[1], ())
+        else:
+            count = instruction[2] if opcode == 'call' else 1 if opcode == 'neg' else 2
+            node = (opcode, instruction[1] if opcode == 'call' else None, tuple(stack[-count:]))
+            del stack[-count:]
+            if all(nodes[child][0] == 'const' for child in node[2]):
+                folded = tuple(('const', nodes[child][1]) for child in node[2]) + (instruction,)
+                try:
+                    node = ('const', run_program(folded, None, call), ())
+                except Exception:
+                    pass
+        # Tag constants with their type: 2 and 2.0 are equal keys but print differently
+        key = (node[0], (type(node[1]), node[1]), node[2]) if node[0] == 'const' else node
+        node_id = interned.get(key)
+        if node_id is None:
+            node_id = interned[key] = len(nodes)
+            nodes.append(node)
+        stack.append(node_id)
+
+    # Both walks use explicit stacks: a long chain such as 1+1+...+1 is a
+    # tree as deep as the expression is long
+    uses = {}
+    pending = [stack[0]]
+    while pending:
+        node_id = pending.pop()
+        uses[node_id] = uses.get(node_id, 0) + 1
+        if uses[node_id] == 1:
+            pending.extend(nodes[node_id][2])
+
+    slots = {}
+    optimized = []
+    pending = [(stack[0], False)]
+    while pending:
+        node_id, children_done = pending.pop()
+        opcode, argument, children = nodes[node_id]
+        if not children_done:
+            if node_id in slots:
+                optimized.append(('load', slots[node_id]))
+                continue
+            pending.append((node_id, True))
+            pending.extend((child, False) for child in reversed(children))
+            continue
+        if opcode in ('const', 'var'):
+            optimized.append((opcode, argument))
+        elif opcode == 'call':
+            optimized.append((opcode, argument, len(children)))
+        else:
+            optimized.append((opcode,))
+        if children and uses[node_id] > 1:
+            slots[node_id] = len(slots)
+            optimized.append(('store', slots[node_id]))
+    return tuple(optimized)
+
+
+class CompiledExpression:
+    def __init__(self, source, program):
+        self.source = source
+        self.program = program
+        # Free variable names in order of first appearance, e.g. ('x', 'y')
+        self.variables = tuple(dict.fromkeys(i[1] for i in program if i[0] == 'var'))
+        # Exact arithmetic only pays off for plain arithmetic on decimal literals
+        # such as 0.1 + 0.2; everything else stays on the float path.
+        self.needs_exact = (any(i[0] == 'const' and isinstance(i[1], float) for i in program)
+                            and all(i[0] in EXACT_OPS for i in program))
+        self.exact_programs = {}
+        # Folded and de-duplicated form used by the float and vectorized paths.
+        # Exact mode keeps the original program so literals are not pre-rounded.
+        self.optimized = optimize(program)
+
+    def evaluate(self, variables=None):
+        return run_program(self.optimized, variables)
+
+    # Same program with its literals converted to Decimal or Fraction from their source text
+    def exact_program(self, mode):
+        program = self.exact_programs.get(mode)
+        if program is None:
+            number = EXACT_TYPES[mode]
+            program = tuple(('const', number(i[2] if len(i) > 2 else str(i[1]))) if i[0] == 'const' else i
+                            for i in self.program)
+            self.exact_programs[mode] = program
+        return program
+
+    def evaluate_exact(self, mode, precision=28, variables=None):
+        with localcontext() as context:
+            context.prec = precision
+            return run_program(self.exact_program(mode), variables)
+
+
+# Bounded LRU cache of compiled expressions keyed by the normalized source
+class ExpressionCache:
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()  # The live preview compiles on a worker thread
+        self.hits = 0
+        self.misses = 0
+
+    # Pass `tokens` when the caller has already tokenized the expression
+    def get(self, expression, tokens=None):
+        key = normalize(expression)
+        with self.lock:
+            compiled = self.entries.get(key)
+            if compiled is not None:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return compiled
+            self.misses += 1
+        try:
+            program = Parser(tokenize(key) if tokens is None else tokens).parse()
+            compiled = CompiledExpression(key, program)
+        except RecursionError:
+            raise ExpressionError("Expression is nested too deeply")
+        with self.lock:
+            self.entries[key] = compiled
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return compiled
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries), 'maxsize': self.maxsize}
+
+
+# Collapse runs of whitespace so trivially re-spaced input shares one cache entry
+def normalize(expression):
+    return " ".join(expression.split())
+
+
+default_cache = ExpressionCache()
+
+
+def compile_expression(expression, cache=None, tokens=None):
+    return (cache or default_cache).get(expression, tokens)
+
+
+def evaluate(expression, cache=None, variables=None):
+    return compile_expression(expression, cache).evaluate(variables)
+
+
+# Evaluate and round to 4 decimal places, exactly as the calculator display does.
+# With exact='decimal' or 'fraction', expressions that need it are evaluated
+# exactly; the rest take the float path.
+def calculate(expression, cache=None, exact=None, precision=28, variables=None):
+    return calculate_compiled(compile_expression(expression, cache), exact, precision, variables)
+
+
+def calculate_compiled(compiled, exact=None, precision=28, variables=None):
+    if exact and compiled.needs_exact:
+        return round_exact(compiled.evaluate_exact(exact, precision))
+    return round(compiled.evaluate(variables), 4)
+
+
+# Decimals are rounded to 4 places like floats, without trailing zeros or
+# exponent notation; fractions stay exact and read back as "3/10".
+def round_exact(value):
+    if isinstance(value, Fraction):
+        return value.numerator if value.denominator == 1 else value
+    with localcontext() as context:
+        context.prec = max(context.prec, value.adjusted() + 6)
+        value = round(value, 4)
+        return value.quantize(Decimal(1)) if value == value.to_integral_value() else value.normalize()
+
+
+# Apply a unary button function (sin/cos/tan in degrees, ln, log, √, %, 1/x...) to a display value
+def apply_function(label, value, registry=default_registry):
+    return round(registry.call(registry.resolve(label).name, value), 4)
@@ -0,0 +1,133 @@
+import math
+import threading
+from collections import OrderedDict
+
+MAX_RESULT_BITS = 1 << 16  # Largest factorial/nCr/nPr result computed, like calc_engine.MAX_POWER_BITS
+
+
+class CalcFunction:
+    def __init__(self, name, func, arity=1, label=None, vectorized=None):
+        self.name = name
+        self.func = func
+        self.arity = arity
+        self.label = label or name  # Text of the calculator button
+        # Optional factory taking the numpy module and returning an array version
+        self.vectorized = vectorized
+
+
+# Registry of the functions shared by the buttons, the keyboard and the
+# expression engine. Functions are only evaluated when called, and results
+# are memoized per (name, arguments) in a bounded LRU cache.
+class FunctionRegistry:
+    def __init__(self, cache_size=1024):
+        self.functions = {}
+        self.labels = {}
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, name, func, arity=1, label=None, vectorized=None):
+        function = CalcFunction(name, func, arity, label, vectorized)
+        self.functions[name] = function
+        self.labels[function.label] = function
+        with self.lock:
+            self.cache.clear()  # A re-registered name must not serve stale results
+        return function
+
+    def __contains__(self, name):
+        return name in self.functions
+
+    def get(self, name):
+        return self.functions[name]
+
+    # Look a function up by its button label or its name
+    def resolve(self, label):
+        return self.labels.get(label) or self.functions[label]
+
+    def call(self, name, *args):
+        key = (name, args)
+        with self.lock:
+            if key in self.cache:
+                self.hits += 1
+                self.cache.move_to_end(key)
+                return self.cache[key]
+            self.misses += 1
+        result = self.functions[name].func(*args)
+        with self.lock:
+            self.cache[key] = result
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return result
+
+    def clear_cache(self):
+        with self.lock:
+            self.cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Factorial and combinatorics accept floats such as 5.0 coming from the display
+def as_int(value):
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"{value} is not a whole number")
+        value = int(value)
+    return value
+
+
+# Refuse arguments whose result would take seconds to compute (and hold the
+# GIL throughout). `bits` is an upper bound: n! <= n**n, nPr and nCr <= n**r.
+def check_result_size(bits):
+    if bits > MAX_RESULT_BITS:
+        from calc_engine import ExpressionError
+        raise ExpressionError("Result is too large")
+
+
+def factorial(n):
+    n = as_int(n)
+    if isinstance(n, int) and n > 0:
+        check_result_size(n * n.bit_length())
+    return math.factorial(n)
+
+
+def combinations(n, r):
+    n, r = as_int(n), as_int(r)
+    if isinstance(n, int) and isinstance(r, int) and 0 <= r <= n:
+        check_result_size(min(r, n - r) * n.bit_length())
+    return math.comb(n, r)
+
+
+def permutations(n, r):
+    n, r = as_int(n), as_int(r)
+    if isinstance(n, int) and isinstance(r, int) and 0 <= r <= n:
+        check_result_size(r * n.bit_length())
+    return math.perm(n, r)
+
+
+def reciprocal(value):
+    if value == 0:
+        raise ValueError("Cannot divide by zero")
+    return 1 / value
+
+
+default_registry = FunctionRegistry()
+register = default_registry.register
+
+# Angles are in degrees, as on the calculator buttons
+register('sin', lambda x: math.sin(math.radians(x)), vectorized=lambda np: lambda x: np.sin(np.radians(x)))
+register('cos', lambda x: math.cos(math.radians(x)), vectorized=lambda np: lambda x: np.cos(np.radians(x)))
+register('tan', lambda x: math.tan(math.radians(x)), vectorized=lambda np: lambda x: np.tan(np.radians(x)))
+register('ln', math.log, vectorized=lambda np: np.log)
+register('log', math.log10, vectorized=lambda np: np.log10)
+register('sqrt', math.sqrt, label='√', vectorized=lambda np: np.sqrt)
+register('percent', lambda x: x / 100, label='%', vectorized=lambda np: lambda x: x / 100)
+register('reciprocal', reciprocal, label='1/x', vectorized=lambda np: np.reciprocal)
+register('sinh', math.sinh, vectorized=lambda np: np.sinh)
+register('cosh', math.cosh, vectorized=lambda np: np.cosh)
+register('tanh', math.tanh, vectorized=lambda np: np.tanh)
+register('exp', math.exp, vectorized=lambda np: np.exp)
+register('fact', factorial, label='n!')
+register('nCr', combinations, arity=2)
+register('nPr', permutations, arity=2)
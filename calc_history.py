@@ -0,0 +1,235 @@
+import os
+import struct
+import threading
+
+# Journal layout: an 8-byte magic header followed by records of
+#   <u32 length> <utf-8 payload> <u32 length>
+# The trailing copy of the length lets the tail be read backwards without
+# scanning the whole file, and a mismatch between the two marks a torn write.
+MAGIC = b"CALCJNL1"
+HEADER_SIZE = len(MAGIC)
+LENGTH = struct.Struct("<I")
+FRAME_SIZE = 2 * LENGTH.size
+
+
+def encode_record(entry):
+    payload = entry.encode("utf-8")
+    length = LENGTH.pack(len(payload))
+    return length + payload + length
+
+
+# Read the record that ends at offset `end`; returns (entry, start) or None if corrupt
+def read_record_before(f, end):
+    if end - FRAME_SIZE < HEADER_SIZE:
+        return None
+    f.seek(end - LENGTH.size)
+    (length,) = LENGTH.unpack(f.read(LENGTH.size))
+    start = end - FRAME_SIZE - length
+    if start < HEADER_SIZE:
+        return None
+    f.seek(start)
+    data = f.read(FRAME_SIZE + length)
+    if LENGTH.unpack_from(data)[0] != length:
+        return None
+    return data[LENGTH.size:LENGTH.size + length].decode("utf-8", errors="replace"), start
+
+
+# Find the end of the last intact record by scanning forward (only needed after a crash)
+def find_valid_end(f, size):
+    pos = HEADER_SIZE
+    while pos + FRAME_SIZE <= size:
+        f.seek(pos)
+        (length,) = LENGTH.unpack(f.read(LENGTH.size))
+        end = pos + FRAME_SIZE + length
+        if end > size:
+            break
+        f.seek(end - LENGTH.size)
+        if LENGTH.unpack(f.read(LENGTH.size))[0] != length:
+            break
+        pos = end
+    return pos
+
+
+# Append-only calculation history.
+# Only the newest `tail_size` entries are read at startup; older ones are paged
+# in on demand with load_older(). A background thread periodically rewrites the
+# file keeping the newest `max_entries` records.
+class HistoryJournal:
+    def __init__(self, path, max_entries=10000, tail_size=200, compact_interval=60.0, legacy_path=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.compact_interval = compact_interval
+        self.lock = threading.RLock()
+        self.entries = []  # Loaded entries, oldest first
+        self.older_offset = HEADER_SIZE  # Where the oldest loaded entry starts in the file
+        self.compaction_due = True  # Check once after opening, then after appends
+
+        if not os.path.exists(path):
+            self._create(legacy_path)
+        self._recover()
+        self.file = open(path, "ab")
+        self.load_older(tail_size)
+
+        self._stop = threading.Event()
+        self._compactor = threading.Thread(target=self._compact_loop, daemon=True)
+        self._compactor.start()
+
+    # Create an empty journal, importing the old one-entry-per-line text history if present
+    def _create(self, legacy_path):
+        with open(self.path, "wb") as f:
+            f.write(MAGIC)
+            if legacy_path and os.path.exists(legacy_path):
+                with open(legacy_path, "r") as legacy:
+                    for line in legacy.read().splitlines():
+                        f.write(encode_record(line))
+            f.flush()
+            os.fsync(f.fileno())
+
+    # Truncate a torn record left by a crash mid-append
+    def _recover(self):
+        with open(self.path, "r+b") as f:
+            if f.read(HEADER_SIZE) != MAGIC:
+                raise ValueError(f"{self.path} is not a calculator history journal")
+            size = f.seek(0, os.SEEK_END)
+            self.older_offset = size
+            if size == HEADER_SIZE or read_record_before(f, size) is not None:
+                return
+            valid_end = find_valid_end(f, size)
+            f.truncate(valid_end)
+            self.older_offset = valid_end
+
+    def append(self, entry):
+        with self.lock:
+            self.file.write(encode_record(entry))
+            self.file.flush()
+            self.entries.append(entry)
+            self.compaction_due = True
+
+    def has_more(self):
+        return self.older_offset > HEADER_SIZE
+
+    # Page in up to `count` entries older than the ones already loaded
+    def load_older(self, count):
+        with self.lock, open(self.path, "rb") as f:
+            older = []
+            while len(older) < count:
+                record = read_record_before(f, self.older_offset)
+                if record is None:
+                    self.older_offset = HEADER_SIZE
+                    break
+                entry, self.older_offset = record
+                older.append(entry)
+            older.reverse()
+            self.entries[:0] = older
+            return older
+
+    def load_all(self):
+        while self.has_more():
+            self.load_older(1000)
+        return self.entries
+
+    # Rewrite the journal keeping only the newest max_entries records
+    def compact(self):
+        with self.lock:
+            self.file.flush()
+            with open(self.path, "rb") as f:
+                end = f.seek(0, os.SEEK_END)
+                kept = []
+                while len(kept) < self.max_entries:
+                    record = read_record_before(f, end)
+                    if record is None:
+                        break
+                    kept.append(record[0])
+                    end = record[1]
+            self.compaction_due = False
+            if end <= HEADER_SIZE:
+                return  # Nothing beyond the cap, keep the file as is
+            kept.reverse()
+
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "wb") as f:
+                f.write(MAGIC)
+                offsets = []
+                for entry in kept:
+                    offsets.append(f.tell())
+                    f.write(encode_record(entry))
+                f.flush()
+                os.fsync(f.fileno())
+            self.file.close()
+            os.replace(temp_path, self.path)
+            self.file = open(self.path, "ab")
+
+            # Keep the in-memory view consistent with what survived on disk
+            if len(self.entries) >= len(kept):
+                self.entries = self.entries[-len(kept):]
+                self.older_offset = HEADER_SIZE
+            else:
+                self.older_offset = offsets[len(kept) - len(self.entries)]
+
+    def _compact_loop(self):
+        while not self._stop.wait(self.compact_interval):
+            if self.compaction_due:
+                try:
+                    self.compact()
+                except OSError:
+                    pass  # Try again on the next interval
+
+    def close(self):
+        self._stop.set()
+        with self.lock:
+            self.file.close()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __getitem__(self, index):
+        return self.entries[index]
+
+
+# Incremental search index over history entries; every query is a substring match.
+# Each entry is posted under all of its 1-, 2- and 3-character grams, so a
+# query of one or two characters is a single posting list, and a longer one is
+# narrowed by intersecting the postings of its trigrams. Results are entry ids,
+# newest first.
+class HistoryIndex:
+    def __init__(self):
+        self.texts = []
+        self.keys = []  # Lower-cased texts, by entry id
+        self.grams = {}  # Gram -> ascending entry ids containing it
+
+    def add(self, text):
+        entry_id = len(self.texts)
+        key = text.lower()
+        self.texts.append(text)
+        self.keys.append(key)
+        grams = {key[i:i + n] for n in (1, 2, 3) for i in range(len(key) - n + 1)}
+        for gram in grams:
+            self.grams.setdefault(gram, []).append(entry_id)
+        return entry_id
+
+    def extend(self, texts):
+        for text in texts:
+            self.add(text)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def search(self, query, limit=None):
+        query = query.lower()
+        if not query:
+            ids = range(len(self.texts) - 1, -1, -1)
+        elif len(query) < 3:
+            ids = self.grams.get(query, [])[::-1]
+        else:
+            grams = {query[i:i + 3] for i in range(len(query) - 2)}
+            postings = sorted((self.grams.get(gram, ()) for gram in grams), key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                if not candidates:
+                    break
+                candidates.intersection_update(posting)
+            ids = sorted((i for i in candidates if query in self.keys[i]), reverse=True)
+        return ids if limit is None else ids[:limit]
@@ -0,0 +1,98 @@
+import calc_engine
+
+# Characters that commonly arrive in pasted text, mapped to what the engine reads.
+# Line breaks and tabs are dropped.
+PASTE_TRANSLATION = str.maketrans({
+    '\u00d7': '*', '\u00f7': '/', '\u2212': '-', '\u2013': '-', '\u00a0': ' ',
+    '\n': None, '\r': None, '\t': None,
+})
+
+
+# Normalize pasted text with a single translate() and validate it with a single
+# tokenizer pass. Raises ExpressionError naming the first unreadable character.
+def clean_paste(text):
+    text = text.translate(PASTE_TRANSLATION)
+    calc_engine.scan(text)
+    return text
+
+
+# Editable display text kept as a gap buffer: characters left of the cursor
+# in one list and characters right of it, reversed, in another. Inserting or
+# deleting at the cursor is O(1) amortized however long the text is.
+# Every edit marks the buffer dirty and at most one flush is scheduled per
+# event-loop tick, so the Tk variable is written once however many edits
+# happened in between.
+class InputBuffer:
+    def __init__(self, on_flush=None, schedule=None):
+        self.before = []
+        self.after = []  # Reversed, so the character right of the cursor is last
+        self.on_flush = on_flush  # Called with (text, cursor)
+        self.schedule = schedule  # e.g. Tk's after_idle
+        self.flush_pending = False
+
+    @property
+    def cursor(self):
+        return len(self.before)
+
+    def text(self):
+        return "".join(self.before) + "".join(reversed(self.after))
+
+    def __len__(self):
+        return len(self.before) + len(self.after)
+
+    def insert(self, text):
+        self.before.extend(text)
+        self.changed()
+
+    def backspace(self, count=1):
+        if self.before:
+            del self.before[-count:]
+            self.changed()
+
+    def delete(self, count=1):
+        if self.after:
+            del self.after[-count:]
+            self.changed()
+
+    def move(self, offset):
+        if offset < 0:
+            moved = self.before[offset:]
+            del self.before[offset:]
+            self.after.extend(reversed(moved))
+        elif offset > 0:
+            moved = self.after[-offset:]
+            del self.after[-offset:]
+            self.before.extend(reversed(moved))
+        else:
+            return
+        self.changed()
+
+    def set_cursor(self, position):
+        self.move(max(0, min(position, len(self))) - self.cursor)
+
+    def home(self):
+        self.move(-self.cursor)
+
+    def end(self):
+        self.move(len(self.after))
+
+    # Replace the whole text, leaving the cursor at the end
+    def set(self, text):
+        self.before = list(str(text))
+        self.after = []
+        self.changed()
+
+    def clear(self):
+        self.set("")
+
+    def changed(self):
+        if self.schedule is None:
+            self.flush()
+        elif not self.flush_pending:
+            self.flush_pending = True
+            self.schedule(self.flush)
+
+    def flush(self):
+        self.flush_pending = False
+        if self.on_flush is not None:
+            self.on_flush(self.text(), self.cursor)
@@ -0,0 +1,246 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import signal
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import calc_engine
+
+DEFAULT_SOCKET = "/tmp/calculator.sock"
+MAX_LINE = 1 << 20  # Longest request line accepted, in bytes
+MAX_PRECISION = 1000  # Largest "precision" a request may ask for
+
+# Evaluate one request item with the same semantics as EnhancedCalculator.
+# Items look like {"expr": "2+3"} (optionally with "exact"/"precision") or
+# {"function": "sin", "value": 30} for a unary button.
+def evaluate_item(item):
+    try:
+        if "function" in item:
+            result = calc_engine.apply_function(item["function"], float(item["value"]))
+        else:
+            precision = min(max(int(item.get("precision", 28)), 1), MAX_PRECISION)
+            result = calc_engine.calculate(item["expr"], exact=item.get("exact"), precision=precision)
+        return {"result": str(result)}
+    except Exception as e:
+        return {"error": str(e) or type(e).__name__}
+
+
+# Whether a request item has the fields evaluate_item reads, with the right types
+def valid_item(item):
+    if not isinstance(item, dict):
+        return False
+    if "function" in item:
+        name, value = item["function"], item.get("value")
+        registry = calc_engine.default_registry
+        return (isinstance(name, str) and (name in registry or name in registry.labels)
+                and isinstance(value, (int, float)) and not isinstance(value, bool))
+    precision = item.get("precision", 28)
+    return (isinstance(item.get("expr"), str) and item.get("exact") in (None, *calc_engine.EXACT_TYPES)
+            and isinstance(precision, int) and not isinstance(precision, bool))
+
+
+# Body of a worker process: evaluate lists of items until the pipe closes.
+# Interrupts are left to the server, which stops its workers itself.
+def worker_main(conn):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        try:
+            items = conn.recv()
+        except EOFError:
+            return
+        conn.send([evaluate_item(item) for item in items])
+
+
+# Evaluation runs in worker processes so a runaway expression (9**9**9,
+# fact(10**6), ...) can actually be stopped. Each executor thread takes an idle
+# worker, drives it over its pipe and hands it back; a worker that misses its
+# deadline is killed and replaced.
+class WorkerPool:
+    def __init__(self, workers):
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.context = multiprocessing.get_context("spawn")  # Never fork the threaded server
+        self.idle = queue.SimpleQueue()
+        self.processes = set()
+        self.lock = threading.Lock()
+        self.closed = False
+        for _ in range(workers):
+            self.idle.put(self._spawn())
+
+    def _spawn(self):
+        parent, child = self.context.Pipe()
+        process = self.context.Process(target=worker_main, args=(child,), daemon=True)
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("worker pool is closed")
+            process.start()
+            self.processes.add(process)
+        child.close()
+        return process, parent
+
+    def _kill(self, process, conn):
+        process.kill()
+        process.join()
+        conn.close()
+        with self.lock:
+            self.processes.discard(process)
+
+    # Runs in an executor thread; raises TimeoutError once the worker has been killed
+    def _call(self, items, timeout):
+        process, conn = self.idle.get()
+        try:
+            conn.send(items)
+            if conn.poll(timeout):
+                result = conn.recv()
+                self.idle.put((process, conn))
+                return result
+            error = TimeoutError()
+        except (EOFError, OSError):
+            error = RuntimeError("worker process died")
+        self._kill(process, conn)
+        self.idle.put(self._spawn())
+        raise error
+
+    async def evaluate(self, items, timeout):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._call, items, timeout)
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            processes, self.processes = self.processes, set()
+        for process in processes:
+            process.kill()
+            process.join()
+        self.executor.shutdown(wait=False)
+
+
+# Newline-delimited JSON server over a Unix domain socket.
+# Requests are {"id": ..., "expr": ...} or {"id": ..., "batch": [item, ...]}.
+# Each connection may have `per_client` requests in flight and the whole server
+# `max_pending`; past that the server stops reading, which pushes back on the
+# sender through the socket buffers. An expression still running after
+# `timeout` seconds has its worker process killed.
+class CalculatorServer:
+    def __init__(self, path=DEFAULT_SOCKET, workers=4, max_pending=256, per_client=32, timeout=2.0,
+                 max_batch=1000):
+        self.path = path
+        self.timeout = timeout
+        self.max_batch = max_batch
+        self.per_client = per_client
+        self.pool = WorkerPool(workers)
+        self.pending = asyncio.Semaphore(max_pending)
+        self.server = None
+        self.owns_socket = False
+
+    # Raises RuntimeError if another server is already listening on `path`
+    async def start(self):
+        if os.path.exists(self.path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.unlink(self.path)  # Stale socket from an earlier run
+            else:
+                raise RuntimeError(f"{self.path} is in use by a running server")
+            finally:
+                probe.close()
+        self.server = await asyncio.start_unix_server(self.handle_client, path=self.path, limit=MAX_LINE)
+        self.owns_socket = True
+        return self.server
+
+    # Serve until SIGINT or SIGTERM
+    async def serve_forever(self):
+        await self.start()
+        print(f"Calculator service listening on {self.path}", flush=True)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        await stop.wait()
+
+    async def handle_client(self, reader, writer):
+        in_flight = asyncio.Semaphore(self.per_client)
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                await in_flight.acquire()
+                await self.pending.acquire()
+                task = asyncio.create_task(self.answer(line, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                task.add_done_callback(lambda t: (in_flight.release(), self.pending.release()))
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, ValueError):
+            pass  # Client went away, or sent a line longer than MAX_LINE
+        finally:
+            writer.close()
+
+    async def answer(self, line, writer, write_lock):
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            response = await asyncio.wait_for(self.evaluate(request), self.timeout)
+        except (asyncio.TimeoutError, TimeoutError):
+            response = {"error": "timeout"}
+        except (ValueError, TypeError, AttributeError, KeyError):
+            response = {"error": "invalid request"}
+        except RuntimeError as e:
+            response = {"error": str(e)}
+        response["id"] = request_id
+        async with write_lock:
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+
+    async def evaluate(self, request):
+        if "batch" in request:
+            items = request["batch"]
+            if not isinstance(items, list):
+                raise TypeError("batch must be a list")
+            if len(items) > self.max_batch:
+                return {"error": f"batch larger than {self.max_batch}"}
+            if not all(valid_item(item) for item in items):
+                raise TypeError("malformed batch item")
+            return {"results": await self.pool.evaluate(items, self.timeout)}
+        if not valid_item(request):
+            raise TypeError("malformed request")
+        return (await self.pool.evaluate([request], self.timeout))[0]
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        self.pool.close()
+        if self.owns_socket and os.path.exists(self.path):
+            os.unlink(self.path)
+            self.owns_socket = False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the calculator engine over a Unix domain socket.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument("--workers", type=int, default=4, help="Evaluation worker processes")
+    parser.add_argument("--max-pending", type=int, default=256, help="Requests in flight across all clients")
+    parser.add_argument("--per-client", type=int, default=32, help="Requests in flight per connection")
+    parser.add_argument("--timeout", type=float, default=2.0, help="Per-request timeout in seconds")
+    args = parser.parse_args(argv)
+
+    server = CalculatorServer(args.socket, args.workers, args.max_pending, args.per_client, args.timeout)
+    try:
+        asyncio.run(server.serve_forever())
+    except RuntimeError as e:
+        parser.exit(1, f"Error: {e}\n")
+    finally:
+        server.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import time
+
+import calc_engine
+from calc_functions import default_registry
+
+# NumPy is optional: it is only imported when table mode is first used
+_np = None
+_vector_functions = {}
+
+def _numpy():
+    global _np
+    if _np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise RuntimeError("Table mode requires NumPy (pip install numpy)")
+        _np = numpy
+    return _np
+
+# Array version of a registered function, built once per function.
+# Functions without a NumPy implementation fall back to np.vectorize.
+def _vector_call(name, *args):
+    func = _vector_functions.get(name)
+    if func is None:
+        function = default_registry.get(name)
+        if function.vectorized is not None:
+            func = function.vectorized(_np)
+        else:
+            func = _np.vectorize(function.func, otypes=[float])
+        _vector_functions[name] = func
+    return func(*args)
+
+# Evaluate an expression over arrays of variable bindings in one vectorized pass.
+# Arrays must broadcast against each other; invalid points become nan/inf
+# instead of raising, so one bad x does not lose the whole table.
+def evaluate_vectorized(expression, **arrays):
+    np = _numpy()
+    compiled = calc_engine.compile_expression(expression)
+    missing = [name for name in compiled.variables if name not in arrays]
+    if missing:
+        raise calc_engine.ExpressionError(f"No values given for {', '.join(missing)}")
+    bound = {name: np.asarray(arrays[name], dtype=float) for name in compiled.variables}
+    with np.errstate(all='ignore'):
+        result = calc_engine.run_program(compiled.optimized, bound, _vector_call)
+        shape = np.broadcast_shapes(*(a.shape for a in bound.values())) if bound else ()
+        return np.round(np.broadcast_to(np.asarray(result, dtype=float), shape), 4)
+
+# Build sample points for each variable.
+# ranges maps a variable name to (start, stop, points); with two variables the
+# points form a grid and each row of the table is one (x, y) pair.
+def make_grid(ranges):
+    np = _numpy()
+    axes = [np.linspace(start, stop, int(points)) for start, stop, points in ranges.values()]
+    if len(axes) > 1:
+        axes = [axis.ravel() for axis in np.meshgrid(*axes, indexing='ij')]
+    return dict(zip(ranges, axes))
+
+# Tabulate an expression over the given ranges.
+# `constants` binds the remaining variables to single values (such as the memory M).
+# Returns (columns, result, elapsed_seconds) where columns maps each variable
+# to its sample points and result holds the matching values.
+def tabulate(expression, ranges, constants=None):
+    columns = make_grid(ranges)
+    start = time.perf_counter()
+    result = evaluate_vectorized(expression, **{**(constants or {}), **columns})
+    return columns, result, time.perf_counter() - start
@@ -1,10 +1,183 @@
 import tkinter as tk
-from tkinter import messagebox
-import math
+from tkinter import messagebox, simpledialog, ttk
+import tkinter.font as tkfont
 import os
+import queue
+import threading
+import time
+import calc_engine
+from calc_functions import default_registry
+import calc_history
+import calc_input
+import calc_table
+
+# Listbox that only holds the rows currently in view.
+# `items` is any indexable sequence (a list or range of ids) and `get_text`
+# turns an item into its row label, so huge lists cost nothing until shown.
+class VirtualList(tk.Frame):
+    def __init__(self, master, get_text, on_select, **kwargs):
+        super().__init__(master, **kwargs)
+        self.get_text = get_text
+        self.on_select = on_select
+        self.items = []
+        self.top = 0
+        self.rows = 1
+
+        self.listbox = tk.Listbox(self, activestyle="none", exportselection=False, font=("Arial", 12))
+        self.scrollbar = tk.Scrollbar(self, command=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+        self.row_height = tkfont.Font(font=self.listbox["font"]).metrics("linespace") + 1
+
+        self.listbox.bind("<Configure>", self.on_resize)
+        self.listbox.bind("<<ListboxSelect>>", self.on_click)
+        self.listbox.bind("<MouseWheel>", lambda e: self.scroll_to(self.top - e.delta // 120 * 3))
+        self.listbox.bind("<Button-4>", lambda e: self.scroll_to(self.top - 3))
+        self.listbox.bind("<Button-5>", lambda e: self.scroll_to(self.top + 3))
+
+    def set_items(self, items):
+        self.items = items
+        self.top = 0
+        self.render()
+
+    def scroll_to(self, top):
+        self.top = max(0, min(top, len(self.items) - self.rows))
+        self.render()
+        return "break"
+
+    def on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.items)))
+        elif unit == "pages":
+            self.scroll_to(self.top + int(amount) * self.rows)
+        else:
+            self.scroll_to(self.top + int(amount))
+
+    def on_resize(self, event):
+        self.rows = max(1, event.height // self.row_height)
+        self.scroll_to(self.top)
+
+    def on_click(self, event):
+        selection = self.listbox.curselection()
+        if selection:
+            self.on_select(self.items[self.top + selection[0]])
+
+    def render(self):
+        visible = self.items[self.top:self.top + self.rows]
+        self.listbox.delete(0, tk.END)
+        self.listbox.insert(tk.END, *(self.get_text(item) for item in visible))
+        total = len(self.items) or 1
+        self.scrollbar.set(self.top / total, min(1.0, (self.top + self.rows) / total))
+
+
+# A single tooltip window shared by all widgets.
+# The window is only created on the first hover, appears after `delay` ms, and
+# its bindings are added alongside any existing <Enter>/<Leave> handlers.
+class Tooltip:
+    def __init__(self, master, delay=500):
+        self.master = master
+        self.delay = delay
+        self.window = None
+        self.label = None
+        self.job = None
+
+    def attach(self, widget, text):
+        widget.bind("<Enter>", lambda e: self.schedule(e, text), add="+")
+        widget.bind("<Leave>", lambda e: self.hide(), add="+")
+        widget.bind("<ButtonPress>", lambda e: self.hide(), add="+")
+
+    def schedule(self, event, text):
+        self.hide()
+        self.job = self.master.after(self.delay, self.show, text, event.x_root + 10, event.y_root + 10)
+
+    def show(self, text, x, y):
+        self.job = None
+        if self.window is None:
+            self.window = tk.Toplevel(self.master)
+            self.window.withdraw()
+            self.window.overrideredirect(True)
+            self.label = tk.Label(self.window, font=("Arial", 8), bg="yellow", relief="solid", bd=1)
+            self.label.pack()
+        self.label.config(text=text)
+        self.window.geometry(f"+{x}+{y}")
+        self.window.deiconify()
+        self.window.lift()
+
+    def hide(self):
+        if self.job is not None:
+            self.master.after_cancel(self.job)
+            self.job = None
+        if self.window is not None:
+            self.window.withdraw()
+
+
+# Debounced evaluation on a worker thread for the live result preview.
+# Every request bumps a generation number; queued work and finished results
+# from older generations are dropped, so only the latest text is ever shown
+# and the Tk thread never waits on an evaluation.
+class LivePreview:
+    def __init__(self, master, compute, show, delay=120):
+        self.master = master
+        self.compute = compute  # Runs on the worker thread
+        self.show = show  # Runs on the Tk thread
+        self.delay = delay
+        self.generation = 0
+        self.submitted = 0
+        self.received = 0
+        self.job = None
+        self.poll_job = None
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def request(self, text):
+        self.generation += 1
+        if self.job is not None:
+            self.master.after_cancel(self.job)
+        self.job = self.master.after(self.delay, self.submit, self.generation, text)
+
+    def submit(self, generation, text):
+        self.job = None
+        self.submitted = generation
+        self.requests.put((generation, text))
+        if self.poll_job is None:
+            self.poll_job = self.master.after(20, self.poll)
+
+    def run(self):
+        while True:
+            generation, text = self.requests.get()
+            try:
+                while True:  # Skip straight to the newest request
+                    generation, text = self.requests.get_nowait()
+            except queue.Empty:
+                pass
+            if generation != self.generation:
+                continue  # Superseded while waiting
+            try:
+                value = self.compute(text)
+            except Exception:
+                value = ""
+            self.results.put((generation, value))
+
+    def poll(self):
+        self.poll_job = None
+        try:
+            while True:
+                generation, value = self.results.get_nowait()
+                self.received = generation
+                if generation == self.generation:
+                    self.show(value)
+        except queue.Empty:
+            pass
+        if self.received < self.submitted:
+            self.poll_job = self.master.after(20, self.poll)
+
 
 class EnhancedCalculator:
-    def __init__(self, master):
+    EXACT_MODES = [None, 'decimal', 'fraction']
+
+    def __init__(self, master, exact_mode=None, decimal_precision=28):
+        started = time.perf_counter()
         self.master = master
         self.master.title("Enhanced Calculator")
         self.master.geometry("400x600")
@@ -12,12 +185,16 @@ class EnhancedCalculator:
 
         self.result_var = tk.StringVar()
         self.memory = 0
-        self.history = []
         self.dark_mode = True
+        # None for plain floats, or 'decimal' / 'fraction' for exact arithmetic when an expression needs it
+        self.exact_mode = exact_mode
+        self.decimal_precision = decimal_precision
 
-        # Check for and load history from file
-        self.history_file = "calculator_history.txt"
+        # Open the history journal, reading only its most recent entries
+        self.history_file = "calculator_history.journal"
         self.load_history()
+        self.history_index = None  # Built the first time the history panel is opened
+        self.history_window = None
 
         # Configure rows and columns for responsiveness
         for i in range(8):
@@ -30,9 +207,30 @@ class EnhancedCalculator:
                                 width=14, borderwidth=4, bg="#FFFFFF", justify='right')
         self.display.grid(row=0, column=0, columnspan=4, sticky="nsew", pady=(10, 10), padx=(10, 10))
 
+        # All edits go through the input buffer, which writes the display at most once per tick
+        self.input = calc_input.InputBuffer(self.update_display, master.after_idle)
+        # Keys typed into the display are handled once here instead of also by the Entry itself
+        self.display.bind("<Key>", self.on_display_key)
+        self.display.bind("<Control-c>", lambda e: self.copy_to_clipboard() or "break")
+        self.display.bind("<Control-v>", lambda e: self.paste_from_clipboard() or "break")
+        self.display.bind("<Control-e>", lambda e: self.cycle_exact_mode() or "break")
+        self.display.bind("<<Cut>>", lambda e: self.cut_to_clipboard() or "break")
+        self.display.bind("<<Clear>>", lambda e: self.delete_selection() or "break")
+        self.display.bind("<<PasteSelection>>", lambda e: self.paste_selection(e) or "break")
+        self.display.bind("<ButtonRelease-1>", lambda e: self.input.set_cursor(self.display.index(tk.INSERT)))
+
+        # Live result preview, evaluated off the Tk thread while typing
+        self.preview_label = tk.Label(master, text="", font=("Arial", 14), bg="#2E2E2E", fg="#A9A9A9", anchor="e")
+        self.preview_label.grid(row=1, column=0, columnspan=4, sticky="nsew", padx=10)
+        self.preview_tokenizer = calc_engine.IncrementalTokenizer()
+        # Every half-typed expression is compiled here, so keep them out of the shared cache and its counters
+        self.preview_cache = calc_engine.ExpressionCache(maxsize=64)
+        self.preview = LivePreview(master, self.compute_preview, self.show_preview)
+        self.result_var.trace_add("write", lambda *args: self.preview.request(self.result_var.get()))
+
         # Memory display label
         self.memory_label = tk.Label(master, text="Memory: 0", font=("Arial", 12), bg="#2E2E2E", fg="white", anchor="e")
-        self.memory_label.grid(row=1, column=0, columnspan=4, sticky="nsew", padx=10)
+        self.memory_label.grid(row=2, column=0, columnspan=4, sticky="nsew", padx=10)
 
         # Button color definitions
         button_colors = {
@@ -52,11 +250,13 @@ class EnhancedCalculator:
             '7', '8', '9', '/',
             '4', '5', '6', '+',
             '1', '2', '3', '-',
-            '0', '.', '=', '*'
+            '0', '.', '=', '*',
+            'exp', 'n!', 'nCr', ','
         ]
 
         # Place buttons with styling and tooltip hints
-        row_val, col_val = 2, 0
+        self.tooltip = Tooltip(master)
+        row_val, col_val = 3, 0
         for button in buttons:
             color = button_colors.get(button, '#D3D3D3')
             btn = tk.Button(master, text=button, font=("Arial", 16), bg=color, fg="white", activebackground="#A9A9A9",
@@ -64,7 +264,7 @@ class EnhancedCalculator:
             btn.grid(row=row_val, column=col_val, sticky="nsew", padx=5, pady=5)
             btn.bind("<Enter>", lambda e, b=btn: b.config(bg="#A9A9A9"))
             btn.bind("<Leave>", lambda e, b=btn, c=color: b.config(bg=c))
-            self.create_tooltip(btn, f"Button '{button}'")
+            self.tooltip.attach(btn, f"Button '{button}'")
 
             col_val += 1
             if col_val > 3:
@@ -73,7 +273,10 @@ class EnhancedCalculator:
 
         # Add a history and toggle button at the bottom row for modes
         self.history_button = tk.Button(master, text="History", font=("Arial", 12), command=self.show_history)
-        self.history_button.grid(row=row_val + 1, column=0, columnspan=2, sticky="nsew", padx=10, pady=(0, 10))
+        self.history_button.grid(row=row_val + 1, column=0, sticky="nsew", padx=(10, 5), pady=(0, 10))
+
+        self.table_button = tk.Button(master, text="Table", font=("Arial", 12), command=self.show_table)
+        self.table_button.grid(row=row_val + 1, column=1, sticky="nsew", padx=(5, 10), pady=(0, 10))
 
         self.mode_toggle_button = tk.Button(master, text="Toggle Mode", font=("Arial", 12), command=self.toggle_mode)
         self.mode_toggle_button.grid(row=row_val + 1, column=2, columnspan=2, sticky="nsew", padx=10, pady=(0, 10))
@@ -82,167 +285,316 @@ class EnhancedCalculator:
         master.bind("<Key>", self.on_key_press)
         master.bind("<Control-c>", lambda e: self.copy_to_clipboard())
         master.bind("<Control-v>", lambda e: self.paste_from_clipboard())
+        master.bind("<Control-e>", lambda e: self.cycle_exact_mode())
+        self.update_memory_label()
+
+        # Construction time in seconds; set CALC_STARTUP_TIMING=1 to print it
+        self.startup_time = time.perf_counter() - started
+        if os.environ.get("CALC_STARTUP_TIMING"):
+            print(f"Calculator constructed in {self.startup_time * 1000:.1f} ms")
+
+    # Runs on the preview worker thread. Only the edited tail of the display is
+    # re-tokenized, and unclosed parentheses are closed so "(2+3" previews as 5.
+    def compute_preview(self, text):
+        tokens = self.preview_tokenizer.tokenize(text)
+        if len(tokens) < 2:
+            return ""  # Empty or a lone number: nothing to preview
+        depth = sum(1 for kind, _ in tokens if kind == calc_engine.LPAREN) - \
+            sum(1 for kind, _ in tokens if kind == calc_engine.RPAREN)
+        if depth > 0:
+            text += ")" * depth
+            tokens = tokens + [(calc_engine.RPAREN, ")")] * depth
+        compiled = calc_engine.compile_expression(text, self.preview_cache, tokens)
+        if set(compiled.variables) - {'M'}:
+            return ""
+        value = calc_engine.calculate_compiled(compiled, self.exact_mode, self.decimal_precision, {'M': self.memory})
+        return f"= {value}"
+
+    def show_preview(self, value):
+        self.preview_label.config(text=value)
+
+    def update_display(self, text, cursor):
+        self.result_var.set(text)
+        self.display.icursor(cursor)
 
     def update_memory_label(self):
-        self.memory_label.config(text=f"Memory: {self.memory}")
+        mode = f"   Exact: {self.exact_mode}" if self.exact_mode else ""
+        self.memory_label.config(text=f"Memory: {self.memory}{mode}")
+
+    # Ctrl+E switches between float, Decimal and Fraction arithmetic
+    def cycle_exact_mode(self):
+        modes = self.EXACT_MODES
+        self.exact_mode = modes[(modes.index(self.exact_mode) + 1) % len(modes)]
+        self.update_memory_label()
 
     def on_button_click(self, char):
         if char == 'C':
-            self.result_var.set("")
+            self.input.clear()
         elif char == 'CE':
-            self.result_var.set(self.result_var.get()[:-1])  # Clear last entry
+            self.input.backspace()  # Clear last entry
         elif char == '=':
             self.calculate_result()
-        elif char == '√':
-            self.calculate_square_root()
         elif char == '^':
-            self.result_var.set(self.result_var.get() + '**')
-        elif char == '%':
-            self.calculate_percentage()
-        elif char == '1/x':
-            self.calculate_reciprocal()
-        elif char in ['sin', 'cos', 'tan', 'ln', 'log']:
-            self.calculate_trig_or_log(char)
+            self.input.insert('**')
+        elif char in default_registry.labels:
+            function = default_registry.labels[char]
+            if function.arity == 1:
+                self.apply_function(char)
+            else:
+                self.input.insert(function.name + '(')  # e.g. nCr(5,2)
         elif char == 'M+':
             self.add_to_memory()
         elif char == 'M-':
             self.subtract_from_memory()
         elif char == 'MR':
-            self.result_var.set(self.memory)
+            self.input.set(self.memory)
         elif char == 'MC':
             self.memory = 0
             self.update_memory_label()
         else:
-            self.result_var.set(self.result_var.get() + char)
+            self.input.insert(char)
 
     def calculate_result(self):
         try:
-            expression = self.result_var.get()
+            expression = self.input.text()
             if expression:
-                result = round(eval(expression), 4)  # Format result to 4 decimal places
-                self.history.append(f"{expression} = {result}")
-                self.save_history()
-                self.result_var.set(result)
+                # "M" in an expression reads the memory; only the parts that depend on it are
+                # recomputed after M+/M-, the rest was folded when the expression was compiled
+                result = calc_engine.calculate(expression, exact=self.exact_mode, precision=self.decimal_precision,
+                                               variables={'M': self.memory})  # Format result to 4 decimal places
+                entry = f"{expression} = {result}"
+                self.history.append(entry)  # Appends one record to the journal
+                if self.history_index is not None:
+                    self.history_index.add(entry)
+                    self.refresh_history_panel()
+                self.input.set(result)
         except Exception:
             messagebox.showerror("Error", "Invalid Input")
-            self.result_var.set("Error")
+            self.input.set("Error")
 
-    def calculate_square_root(self):
+    # Apply a registered unary function (√, %, 1/x, sin, ln, n!...) to the displayed value
+    def apply_function(self, label):
         try:
-            value = float(self.result_var.get())
-            self.result_var.set(round(math.sqrt(value), 4))  # 4 decimal places
-        except ValueError:
-            messagebox.showerror("Error", "Invalid Input")
-            self.result_var.set("Error")
-
-    def calculate_percentage(self):
-        try:
-            value = float(self.result_var.get())
-            self.result_var.set(round(value / 100, 4))  # 4 decimal places
-        except ValueError:
-            messagebox.showerror("Error", "Invalid Input")
-            self.result_var.set("Error")
-
-    def calculate_reciprocal(self):
-        try:
-            value = float(self.result_var.get())
-            if value == 0:
-                raise ValueError("Cannot divide by zero")
-            self.result_var.set(round(1 / value, 4))  # 4 decimal places
-        except ValueError:
+            value = float(self.input.text())
+            self.input.set(calc_engine.apply_function(label, value))  # 4 decimal places
+        except (ValueError, OverflowError):
             messagebox.showerror("Error", "Invalid Input")
-            self.result_var.set("Error")
-
-    def calculate_trig_or_log(self, char):
-        try:
-            value = float(self.result_var.get())
-            result = {
-                'sin': math.sin(math.radians(value)),
-                'cos': math.cos(math.radians(value)),
-                'tan': math.tan(math.radians(value)),
-                'ln': math.log(value),
-                'log': math.log10(value)
-            }.get(char)
-            self.result_var.set(round(result, 4))  # 4 decimal places
-        except ValueError:
-            messagebox.showerror("Error", "Invalid Input")
-            self.result_var.set("Error")
+            self.input.set("Error")
 
     def add_to_memory(self):
         try:
-            self.memory += float(self.result_var.get())
+            self.memory += float(self.input.text())
             self.update_memory_label()
         except ValueError:
             messagebox.showerror("Error", "Invalid Input")
 
     def subtract_from_memory(self):
         try:
-            self.memory -= float(self.result_var.get())
+            self.memory -= float(self.input.text())
             self.update_memory_label()
         except ValueError:
             messagebox.showerror("Error", "Invalid Input")
 
     def on_key_press(self, event):
         char = event.char
-        if char.isdigit() or char in '+-*/.()':
-            self.result_var.set(self.result_var.get() + char)
+        if char.isalnum() or char in '+-*/.(),^':  # Letters spell registered function names
+            self.input.insert(char)
         elif char == '\r':  # Enter key
             self.calculate_result()
         elif char == '\b':  # Backspace key
-            self.result_var.set(self.result_var.get()[:-1])
+            self.input.backspace()
         elif event.keysym == 'Escape':
-            self.result_var.set("")
+            self.input.clear()
+        elif event.keysym == 'Delete':
+            self.input.delete()
+        elif event.keysym == 'Left':
+            self.input.move(-1)
+        elif event.keysym == 'Right':
+            self.input.move(1)
+        elif event.keysym == 'Home':
+            self.input.home()
+        elif event.keysym == 'End':
+            self.input.end()
+
+    def on_display_key(self, event):
+        if event.keysym == 'Tab':
+            return None  # Focus traversal
+        if event.state & 0x4:
+            # The Entry's own Control bindings (Ctrl+H/D/K/T...) would edit the
+            # text behind the input buffer, so only copy reaches them
+            if event.keysym in ('c', 'C'):
+                return None
+            if event.keysym in ('a', 'A', 'slash'):
+                self.display.selection_range(0, tk.END)
+            elif event.keysym in ('x', 'X'):
+                self.cut_to_clipboard()
+            return "break"
+        self.on_key_press(event)
+        return "break"
 
     def show_history(self):
-        if self.history:
-            messagebox.showinfo("History", "\n".join(self.history))
-        else:
+        if self.history_window is not None:
+            self.history_window.lift()
+            return
+        if not self.history:
             messagebox.showinfo("History", "No history available.")
+            return
+
+        self.history_window = tk.Toplevel(self.master)
+        self.history_window.title("History")
+        self.history_window.geometry("400x500")
+        self.history_window.protocol("WM_DELETE_WINDOW", self.close_history_panel)
+
+        self.history_search_var = tk.StringVar()
+        search = tk.Entry(self.history_window, textvariable=self.history_search_var, font=("Arial", 12))
+        search.pack(fill=tk.X, padx=10, pady=(10, 5))
+        search.focus_set()
+        self.history_status = tk.Label(self.history_window, anchor="w")
+        self.history_status.pack(fill=tk.X, padx=10)
+        self.history_list = VirtualList(self.history_window, lambda i: self.history_index.texts[i],
+                                        self.on_history_select)
+        self.history_list.pack(expand=True, fill=tk.BOTH, padx=10, pady=(5, 10))
+
+        self.history_search_job = None
+        self.history_search_var.trace_add("write", lambda *args: self.schedule_history_search())
+
+        if self.history_index is None:
+            # Page the whole journal in and index it a chunk per event-loop tick
+            self.history_index = calc_history.HistoryIndex()
+            self.index_history_chunk(self.history.load_all()[:], 0)
+        else:
+            self.refresh_history_panel()
+
+    def index_history_chunk(self, entries, start, chunk_size=5000):
+        self.history_index.extend(entries[start:start + chunk_size])
+        if start + chunk_size < len(entries):
+            self.master.after(1, self.index_history_chunk, entries, start + chunk_size)
+        self.refresh_history_panel()
+
+    def schedule_history_search(self):
+        if self.history_search_job is not None:
+            self.master.after_cancel(self.history_search_job)
+        self.history_search_job = self.master.after(150, self.refresh_history_panel)
+
+    def refresh_history_panel(self):
+        if self.history_window is None:
+            return
+        self.history_search_job = None
+        matches = self.history_index.search(self.history_search_var.get())
+        self.history_list.set_items(matches)
+        self.history_status.config(text=f"{len(matches)} of {len(self.history_index)} entries")
+
+    # Put the clicked entry's expression back into the display
+    def on_history_select(self, entry_id):
+        expression = self.history_index.texts[entry_id].rsplit(" = ", 1)[0]
+        self.input.set(expression)
+
+    def close_history_panel(self):
+        self.history_window.destroy()
+        self.history_window = None
+
+    # Tabulate the displayed expression over ranges of its free variables, e.g. "sin(x)^2 + 3*x".
+    # "M" is not a table variable: it reads the memory, as it does in a normal calculation.
+    def show_table(self):
+        expression = simpledialog.askstring("Table", "Expression in x (and y):", initialvalue=self.input.text(),
+                                            parent=self.master)
+        if not expression:
+            return
+        try:
+            compiled = calc_engine.compile_expression(expression)
+            variables = [name for name in compiled.variables if name != 'M']
+            if not 1 <= len(variables) <= 2:
+                raise ValueError("Use one or two variables, e.g. x or x and y")
+            ranges = {}
+            for name in variables:
+                answer = simpledialog.askstring("Table", f"Range for {name} as start, stop, points:",
+                                                initialvalue="0, 360, 1000", parent=self.master)
+                if not answer:
+                    return
+                start, stop, points = (float(part) for part in answer.split(","))
+                ranges[name] = (start, stop, points)
+            columns, result, elapsed = calc_table.tabulate(expression, ranges, {'M': self.memory})
+        except (calc_engine.ExpressionError, ArithmeticError, ValueError, RuntimeError) as e:
+            messagebox.showerror("Error", str(e) or type(e).__name__)
+            return
+
+        window = tk.Toplevel(self.master)
+        window.title(f"Table: {expression}")
+        window.geometry("400x500")
+        tk.Label(window, text=f"{result.size} points evaluated in {elapsed * 1000:.1f} ms").pack(fill=tk.X)
+
+        names = list(columns) + ["result"]
+        tree = ttk.Treeview(window, columns=names, show="headings")
+        for name in names:
+            tree.heading(name, text=name)
+            tree.column(name, width=100, anchor="e")
+        scrollbar = tk.Scrollbar(window, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(expand=True, fill=tk.BOTH)
+
+        # Showing a million rows would stall Tk, so sample at most 1000 evenly spaced rows
+        step = max(1, result.size // 1000)
+        for i in range(0, result.size, step):
+            tree.insert("", tk.END, values=[round(float(columns[name][i]), 4) for name in columns] + [result[i]])
 
     def toggle_mode(self):
         self.dark_mode = not self.dark_mode
         bg_color, fg_color = ("#2E2E2E", "white") if self.dark_mode else ("#FFFFFF", "black")
         self.master.configure(bg=bg_color)
         self.display.configure(bg=bg_color, fg=fg_color)
-
-    def create_tooltip(self, widget, text):
-        tooltip = tk.Toplevel(widget)
-        tooltip.withdraw()
-        tooltip.overrideredirect(True)
-        label = tk.Label(tooltip, text=text, font=("Arial", 8), bg="yellow", relief="solid", bd=1)
-        label.pack()
-        
-        def show_tooltip(event):
-            tooltip.geometry(f"+{event.x_root + 10}+{event.y_root + 10}")
-            tooltip.deiconify()
-
-        def hide_tooltip(event):
-            tooltip.withdraw()
-
-        widget.bind("<Enter>", show_tooltip)
-        widget.bind("<Leave>", hide_tooltip)
+        self.preview_label.configure(bg=bg_color)
 
     def copy_to_clipboard(self):
         self.master.clipboard_clear()
-        self.master.clipboard_append(self.result_var.get())
+        self.master.clipboard_append(self.input.text())
+
+    # Remove the text selected in the display through the input buffer
+    def delete_selection(self):
+        if not self.display.selection_present():
+            return
+        first, last = self.display.index("sel.first"), self.display.index("sel.last")
+        self.display.selection_clear()
+        if last > first:
+            self.input.set_cursor(last)
+            self.input.backspace(last - first)
+
+    def cut_to_clipboard(self):
+        if not self.display.selection_present():
+            return
+        self.master.clipboard_clear()
+        self.master.clipboard_append(self.display.selection_get())
+        self.delete_selection()
+
+    # Middle-click paste of the primary selection at the pointer, cleaned like a clipboard paste
+    def paste_selection(self, event):
+        try:
+            paste_val = self.master.selection_get()
+        except tk.TclError:
+            return  # Nothing selected anywhere
+        self.input.set_cursor(self.display.index(f"@{event.x}"))
+        try:
+            self.input.insert(calc_input.clean_paste(paste_val))
+        except calc_engine.ExpressionError as e:
+            messagebox.showerror("Error", f"Cannot paste: {e}")
 
     def paste_from_clipboard(self):
         try:
             paste_val = self.master.clipboard_get()
-            self.result_var.set(self.result_var.get() + paste_val)
         except tk.TclError:
             messagebox.showerror("Error", "No text in clipboard")
-
-    def save_history(self):
-        with open(self.history_file, 'w') as f:
-            f.write("\n".join(self.history))
+            return
+        try:
+            self.input.insert(calc_input.clean_paste(paste_val))
+        except calc_engine.ExpressionError as e:
+            messagebox.showerror("Error", f"Cannot paste: {e}")
 
     def load_history(self):
-        if os.path.exists(self.history_file):
-            with open(self.history_file, 'r') as f:
-                self.history = f.read().splitlines()
+        # The old text history is imported into the journal the first time it is created
+        self.history = calc_history.HistoryJournal(self.history_file, legacy_path="calculator_history.txt")
 
 # Run the calculator
-root = tk.Tk()
-app = EnhancedCalculator(root)
-root.mainloop()
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = EnhancedCalculator(root)
+    root.mainloop()
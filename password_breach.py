@@ -0,0 +1,277 @@
+import argparse
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+
+# Corpus layout: a 16-byte header (magic, format version, reserved) followed by
+# raw 20-byte SHA-1 digests in ascending order with duplicates removed.
+# SHA-1 output is uniformly distributed, so interpolation on the leading eight
+# bytes lands within a record or two of the target in a couple of probes.
+MAGIC = b"PWBREACH"
+BLOOM_MAGIC = b"PWBLOOM2"
+VERSION = 1
+HEADER = struct.Struct("<8sII")
+# magic, bit count, hash count, then the record count and st_mtime_ns of the
+# corpus the filter was built from; a filter that no longer matches is ignored
+BLOOM_HEADER = struct.Struct("<8sQIQq")
+DIGEST_SIZE = 20
+PREFIX = struct.Struct(">Q")
+
+
+def password_digest(password):
+    return hashlib.sha1(password.encode("utf-8")).digest()
+
+
+# Digests from an HIBP-style dump: "HEX[:count]" per line, in any order
+def read_dump(path):
+    with open(path, "rb") as f:
+        for line in f:
+            hex_digest = line[:40]
+            if len(hex_digest) == 40:
+                try:
+                    yield bytes.fromhex(hex_digest.decode("ascii"))
+                except ValueError:
+                    continue  # Header or malformed line
+
+
+# Consecutive 20-byte digests from the current position of a binary file
+def iter_digests(f, block=DIGEST_SIZE * 8192):
+    while True:
+        data = f.read(block)
+        if not data:
+            return
+        for i in range(0, len(data) - DIGEST_SIZE + 1, DIGEST_SIZE):
+            yield data[i:i + DIGEST_SIZE]
+
+
+def _read_run(path):
+    with open(path, "rb") as f:
+        yield from iter_digests(f)
+
+
+# Build the sorted corpus with an external merge sort: sorted runs of
+# run_size digests are spilled to temporary files and merged in one pass,
+# so memory stays bounded however large the dump is.
+# Returns the number of distinct digests written.
+def build_corpus(dump_path, output_path, run_size=2000000, digests=None):
+    workdir = tempfile.mkdtemp(prefix="breach_", dir=os.path.dirname(os.path.abspath(output_path)))
+    runs = []
+    try:
+        run = []
+        for digest in (read_dump(dump_path) if digests is None else digests):
+            run.append(digest)
+            if len(run) >= run_size:
+                runs.append(_spill(run, workdir, len(runs)))
+                run = []
+        if run:
+            runs.append(_spill(run, workdir, len(runs)))
+
+        count = 0
+        temp_path = output_path + ".tmp"
+        with open(temp_path, "wb") as out:
+            out.write(HEADER.pack(MAGIC, VERSION, 0))
+            previous = None
+            buffer = []
+            for digest in heapq.merge(*(_read_run(path) for path in runs)):
+                if digest == previous:
+                    continue
+                previous = digest
+                buffer.append(digest)
+                if len(buffer) >= 8192:
+                    out.write(b"".join(buffer))
+                    count += len(buffer)
+                    buffer = []
+            out.write(b"".join(buffer))
+            count += len(buffer)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(temp_path, output_path)
+        return count
+    finally:
+        for path in runs:
+            os.remove(path)
+        os.rmdir(workdir)
+
+
+def _spill(run, workdir, number):
+    run.sort()
+    path = os.path.join(workdir, f"run{number}.bin")
+    with open(path, "wb") as f:
+        f.write(b"".join(run))
+    return path
+
+
+# Bloom filter positions for a digest by double hashing two 64-bit slices of it
+def _bloom_positions(digest, bits, hashes):
+    h1, h2 = struct.unpack_from("<QQ", digest)
+    h2 |= 1
+    return [(h1 + i * h2) % bits for i in range(hashes)]
+
+
+# Build a Bloom filter sidecar for a sorted corpus.
+# At 10 bits per digest about 1% of absent passwords reach the corpus file at all.
+def build_bloom(corpus_path, bloom_path, bits_per_digest=10):
+    with open(corpus_path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        count = (stat.st_size - HEADER.size) // DIGEST_SIZE
+        bits = max(64, count * bits_per_digest)
+        hashes = max(1, round(bits / max(count, 1) * math.log(2)))
+        table = bytearray((bits + 7) // 8)
+        f.seek(HEADER.size)
+        for digest in iter_digests(f):
+            for position in _bloom_positions(digest, bits, hashes):
+                table[position >> 3] |= 1 << (position & 7)
+    temp_path = bloom_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(BLOOM_HEADER.pack(BLOOM_MAGIC, bits, hashes, count, stat.st_mtime_ns))
+        f.write(table)
+    os.replace(temp_path, bloom_path)
+
+
+# Membership checks against a sorted corpus, read through mmap so only the
+# handful of pages a lookup touches become resident. A Bloom filter built for
+# another corpus (or an older copy of this one) is skipped and `bloom_stale`
+# set, since it could wrongly report breached passwords as absent.
+class BreachChecker:
+    def __init__(self, path, bloom_path=None):
+        self.file = open(path, "rb")
+        stat = os.fstat(self.file.fileno())
+        if stat.st_size < HEADER.size or HEADER.unpack(self.file.read(HEADER.size))[0] != MAGIC:
+            self.file.close()
+            raise ValueError(f"{path} is not a breach corpus")
+        self.count = (stat.st_size - HEADER.size) // DIGEST_SIZE
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.count else None
+
+        self.bloom = None
+        self.bloom_stale = False
+        if bloom_path and os.path.exists(bloom_path):
+            try:
+                self._open_bloom(bloom_path, stat.st_mtime_ns)
+            except ValueError:
+                self.close()
+                raise
+
+    def _open_bloom(self, bloom_path, corpus_mtime):
+        with open(bloom_path, "rb") as f:
+            header = f.read(BLOOM_HEADER.size)
+            if header[:len(BLOOM_MAGIC) - 1] != BLOOM_MAGIC[:-1]:
+                raise ValueError(f"{bloom_path} is not a breach Bloom filter")
+            if len(header) < BLOOM_HEADER.size or header[:len(BLOOM_MAGIC)] != BLOOM_MAGIC:
+                self.bloom_stale = True  # Written by another format version
+                return
+            _, bits, hashes, count, mtime = BLOOM_HEADER.unpack(header)
+            if (count, mtime) != (self.count, corpus_mtime) \
+                    or os.fstat(f.fileno()).st_size < BLOOM_HEADER.size + (bits + 7) // 8:
+                self.bloom_stale = True
+                return
+            self.bloom_bits, self.bloom_hashes = bits, hashes
+            self.bloom = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)  # Stays valid after the file closes
+
+    def __len__(self):
+        return self.count
+
+    def _record(self, index):
+        offset = HEADER.size + index * DIGEST_SIZE
+        return self.map[offset:offset + DIGEST_SIZE]
+
+    def _maybe_present(self, digest):
+        bloom = self.bloom
+        base = BLOOM_HEADER.size
+        for position in _bloom_positions(digest, self.bloom_bits, self.bloom_hashes):
+            if not bloom[base + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+
+    def contains_digest(self, digest):
+        if not self.count:
+            return False
+        if self.bloom is not None and not self._maybe_present(digest):
+            return False
+        key = PREFIX.unpack_from(digest)[0]
+        lo, hi = 0, self.count - 1
+        # A few interpolation probes, then plain binary search so a skewed
+        # corpus can never make a lookup slower than O(log n)
+        probes = 0
+        while lo <= hi:
+            if probes < 4:
+                lo_key = PREFIX.unpack_from(self.map, HEADER.size + lo * DIGEST_SIZE)[0]
+                hi_key = PREFIX.unpack_from(self.map, HEADER.size + hi * DIGEST_SIZE)[0]
+                if key < lo_key or key > hi_key:
+                    return False
+                mid = lo if hi_key == lo_key else lo + (key - lo_key) * (hi - lo) // (hi_key - lo_key)
+                probes += 1
+            else:
+                mid = (lo + hi) // 2
+            record = self._record(mid)
+            if record == digest:
+                return True
+            if record < digest:
+                lo = mid + 1
+            else:
+                hi = mid - 1
+        return False
+
+    def is_breached(self, password):
+        return self.contains_digest(password_digest(password))
+
+    def close(self):
+        for m in (self.map, self.bloom):
+            if m is not None:
+                m.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query an offline breached-password corpus.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Convert a SHA-1 text dump into a sorted binary corpus")
+    build.add_argument("dump", help="Text dump with one HEX[:count] line per hash")
+    build.add_argument("corpus", help="Output corpus file")
+    build.add_argument("--bloom", help="Also write a Bloom filter sidecar to this path")
+    build.add_argument("--run-size", type=int, default=2000000, help="Digests sorted in memory per run")
+    bloom = commands.add_parser("bloom", help="Rebuild the Bloom filter sidecar of an existing corpus")
+    bloom.add_argument("corpus")
+    bloom.add_argument("bloom")
+    check = commands.add_parser("check", help="Check passwords (arguments or stdin lines) against a corpus")
+    check.add_argument("corpus")
+    check.add_argument("passwords", nargs="*")
+    check.add_argument("--bloom", help="Bloom filter sidecar built with the corpus")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        started = time.perf_counter()
+        count = build_corpus(args.dump, args.corpus, args.run_size)
+        if args.bloom:
+            build_bloom(args.corpus, args.bloom)
+        print(f"Wrote {count} digests to {args.corpus} in {time.perf_counter() - started:.1f}s")
+        return
+    if args.command == "bloom":
+        build_bloom(args.corpus, args.bloom)
+        return
+
+    passwords = args.passwords or (line.rstrip("\n") for line in sys.stdin)
+    with BreachChecker(args.corpus, args.bloom) as checker:
+        if checker.bloom_stale:
+            print(f"Warning: {args.bloom} does not match {args.corpus} and is ignored; "
+                  f"rebuild it with: {parser.prog} bloom {args.corpus} {args.bloom}", file=sys.stderr)
+        breached = 0
+        for password in passwords:
+            found = checker.is_breached(password)
+            breached += found
+            print(f"{'BREACHED' if found else 'ok'}\t{password}")
+    sys.exit(1 if breached else 0)
+
+if __name__ == "__main__":
+    main()
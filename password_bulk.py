@@ -0,0 +1,186 @@
+import argparse
+import os
+import string
+import sys
+import time
+
+SPECIAL_CHARACTERS = "!@#$%^&*()?|[]~`"
+
+# NumPy is optional: it only speeds up the character-class check for large batches
+_np = None
+
+def _numpy():
+    global _np
+    if _np is None:
+        try:
+            import numpy
+        except ImportError:
+            _np = False
+        else:
+            _np = numpy
+    return _np or None
+
+# Character classes selected by the generator options, in a fixed order
+def character_classes(use_lowercase=True, use_uppercase=True, use_digits=True, use_special=True):
+    classes = []
+    if use_lowercase:
+        classes.append(string.ascii_lowercase)
+    if use_uppercase:
+        classes.append(string.ascii_uppercase)
+    if use_digits:
+        classes.append(string.digits)
+    if use_special:
+        classes.append(SPECIAL_CHARACTERS)
+    return classes
+
+
+# Generates passwords in batches from large os.urandom reads.
+# Each random byte is mapped to a character with one bytes.translate() call;
+# bytes at or above the largest multiple of the alphabet size are deleted in
+# the same call, so every character is equally likely (rejection sampling,
+# no modulo bias). A password that misses one of the selected classes is
+# rejected as a whole, which keeps the "at least one of each class" guarantee
+# and makes every valid password equally likely.
+class PasswordGenerator:
+    def __init__(self, length, use_lowercase=True, use_uppercase=True, use_digits=True, use_special=True,
+                 use_numpy=None):
+        classes = character_classes(use_lowercase, use_uppercase, use_digits, use_special)
+        if not classes:
+            raise ValueError("You must select at least one character type!")
+        if length < len(classes):
+            raise ValueError(f"Please enter a valid password length (at least {len(classes)}).")
+        self.length = length
+        self.alphabet = "".join(classes)
+        self.classes = [frozenset(c) for c in classes]
+
+        size = len(self.alphabet)
+        self.limit = 256 - 256 % size
+        self.table = bytes(ord(self.alphabet[b % size]) for b in range(256))
+        self.rejected = bytes(range(self.limit, 256))
+
+        # Fraction of uniformly drawn passwords that contain every class (inclusion-exclusion)
+        self.acceptance = 0.0
+        for mask in range(1 << len(classes)):
+            missing = sum(len(c) for i, c in enumerate(classes) if mask >> i & 1)
+            sign = -1 if bin(mask).count("1") % 2 else 1
+            self.acceptance += sign * ((size - missing) / size) ** length
+
+        self.use_numpy = use_numpy
+        self.class_bits = None
+        if use_numpy and _numpy() is None:
+            raise RuntimeError("NumPy is not installed (pip install numpy)")
+
+    # `count` uniformly random characters from the alphabet, as ASCII bytes
+    def random_characters(self, count):
+        chars = b""
+        while len(chars) < count:
+            need = count - len(chars)
+            raw = os.urandom(need * 256 // self.limit + 64)
+            chars += raw.translate(self.table, self.rejected)
+        return chars[:count]
+
+    # Per-byte bitmask of the classes each character belongs to, built on first use
+    def numpy_class_bits(self):
+        if self.class_bits is None:
+            np = _numpy()
+            bits = np.zeros(256, dtype=np.uint8)
+            for i, c in enumerate(self.classes):
+                bits[[ord(ch) for ch in c]] |= 1 << i
+            self.class_bits = bits
+        return self.class_bits
+
+    def accepted(self, chars, count):
+        length = self.length
+        text = chars.decode("ascii")
+        # Small batches (such as one GUI password) never pay for importing NumPy
+        if count >= 64 and self.use_numpy is not False and _numpy() is not None:
+            np = _np
+            rows = np.frombuffer(chars, dtype=np.uint8).reshape(count, length)
+            present = np.bitwise_or.reduce(self.numpy_class_bits()[rows], axis=1)
+            all_classes = (1 << len(self.classes)) - 1
+            return [text[i * length:(i + 1) * length] for i in np.flatnonzero(present == all_classes)]
+        passwords = [text[i:i + length] for i in range(0, count * length, length)]
+        if len(self.classes) == 1:
+            return passwords
+        return [p for p in passwords if not any(c.isdisjoint(p) for c in self.classes)]
+
+    # Exactly `count` passwords
+    def generate(self, count):
+        passwords = []
+        while len(passwords) < count:
+            # Draw enough candidates that one round usually suffices
+            candidates = int((count - len(passwords)) / self.acceptance * 1.1) + 1
+            passwords.extend(self.accepted(self.random_characters(candidates * self.length), candidates))
+        del passwords[count:]
+        return passwords
+
+    # Yield lists of at most batch_size passwords until `count` have been produced
+    def stream(self, count, batch_size=10000):
+        remaining = count
+        while remaining > 0:
+            batch = self.generate(min(batch_size, remaining))
+            remaining -= len(batch)
+            yield batch
+
+
+def generate_passwords(count, length, use_lowercase=True, use_uppercase=True, use_digits=True, use_special=True):
+    generator = PasswordGenerator(length, use_lowercase, use_uppercase, use_digits, use_special)
+    return generator.generate(count)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate passwords in bulk, one per line.")
+    parser.add_argument("-n", "--count", type=int, default=1000, help="Number of passwords")
+    parser.add_argument("-l", "--length", type=int, default=16, help="Password length")
+    parser.add_argument("-o", "--output", default="-", help="Output file (default: stdout)")
+    parser.add_argument("--no-lowercase", action="store_true", help="Leave out lowercase letters")
+    parser.add_argument("--no-uppercase", action="store_true", help="Leave out uppercase letters")
+    parser.add_argument("--no-digits", action="store_true", help="Leave out digits")
+    parser.add_argument("--no-special", action="store_true", help="Leave out special characters")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Passwords generated and written per batch")
+    parser.add_argument("--numpy", dest="use_numpy", action="store_true", default=None,
+                        help="Require NumPy for the class check (default: use it when installed)")
+    parser.add_argument("--no-numpy", dest="use_numpy", action="store_false", help="Never use NumPy")
+    parser.add_argument("--score", action="store_true", help="Append the estimated strength in bits to each line")
+    parser.add_argument("-w", "--words", type=int, help="Generate diceware passphrases of this many words instead")
+    parser.add_argument("--wordlist", help="Text or compiled wordlist for --words (default: eff_large_wordlist.txt)")
+    parser.add_argument("--separators", default="-", help="Passphrase separator characters, one picked per gap")
+    parser.add_argument("--capitalize", choices=("lower", "title", "upper", "random"), default="lower")
+    parser.add_argument("--digits", type=int, default=0, help="Length of a digit block inserted into each passphrase (0-18)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.words is not None:
+            import password_wordlist
+            wordlist = password_wordlist.open_wordlist(args.wordlist or password_wordlist.DEFAULT_WORDLIST)
+            generator = password_wordlist.PassphraseGenerator(wordlist, args.words, args.separators,
+                                                              args.capitalize, args.digits)
+            print(f"{generator.bits:.1f} bits of entropy per passphrase", file=sys.stderr)
+        else:
+            generator = PasswordGenerator(args.length, not args.no_lowercase, not args.no_uppercase,
+                                          not args.no_digits, not args.no_special, args.use_numpy)
+    except (OSError, ValueError, RuntimeError) as e:
+        parser.error(str(e))
+
+    if args.score:
+        import password_entropy
+        automaton = password_entropy.get_automaton()
+
+    outfile = sys.stdout if args.output == "-" else open(args.output, 'w')
+    started = time.perf_counter()
+    try:
+        for batch in generator.stream(args.count, args.batch_size):
+            if args.score:
+                estimates = password_entropy.estimate_many(batch, automaton)
+                batch = [f"{e.password}\t{e.bits:.1f}" for e in estimates]
+            outfile.write("\n".join(batch) + "\n")
+    finally:
+        if outfile is not sys.stdout:
+            outfile.close()
+    elapsed = time.perf_counter() - started
+    # Reported on stderr so stdout stays a clean password stream
+    print(f"{args.count} passwords in {elapsed:.3f}s ({args.count / elapsed if elapsed else float('inf'):,.0f} passwords/sec)",
+          file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import argparse
+import sys
+import time
+
+import password_core
+
+# Command-line front end for password_core; no Tk. Each command imports only
+# what it uses, so `generate` never loads the vault, KDF or cryptography.
+
+
+def generate(args):
+    try:
+        if args.words is not None:
+            generator = password_core.passphrase_generator(args.words, args.separators, args.capitalize,
+                                                           args.digits, args.wordlist)
+        else:
+            import password_bulk
+            generator = password_bulk.PasswordGenerator(args.length, not args.no_lowercase, not args.no_uppercase,
+                                                        not args.no_digits, not args.no_special)
+    except (OSError, ValueError) as e:
+        sys.exit(f"Error: {e}")
+    for batch in generator.stream(args.count):
+        sys.stdout.write("\n".join(batch) + "\n")
+
+
+def score(args):
+    passwords = args.passwords or (line.rstrip("\n") for line in sys.stdin)
+    for password in passwords:
+        estimate = password_core.estimate_strength(password)
+        print(f"{estimate.score}\t{estimate.bits:.1f}\t{estimate.label}\t{password}")
+
+
+def save(args):
+    password = args.password
+    if password is None:
+        import getpass
+        password = getpass.getpass("Password to save: ")
+    if password_core.is_breached(password) and not args.force:
+        sys.exit("Error: this password appears in a known data breach (use --force to save it anyway)")
+    entry = password_core.save_password(password, args.vault)
+    print(f"Saved entry {entry} to {args.vault} (encrypted).")
+
+
+# Set the master password, or change it after confirming the current one
+def set_master(args):
+    import getpass
+    current = None
+    if password_core.has_master_password():
+        current = getpass.getpass("Current master password: ")
+    password = getpass.getpass("New master password: ")
+    if getpass.getpass("Repeat new master password: ") != password:
+        sys.exit("Error: the passwords do not match")
+    try:
+        password_core.set_master_password(password, current)
+    except ValueError as e:
+        sys.exit(f"Error: {e}")
+    print("Master password set.")
+
+
+# Entries with their save date and expiry state, read from the vault header
+# records and the expiry index; nothing is decrypted unless --decrypt is given
+def list_entries(args):
+    vault = password_core.open_vault(args.vault)
+    index = password_core.open_expiry_index(args.vault)
+    status = index.status(password_core.EXPIRY_WARNING_WINDOW)
+    expired, expiring = set(status.expired), set(status.expiring)
+    live = set(index.entries)
+    entries = range(len(vault)) if args.all else index.live()
+
+    plaintext = None
+    if args.decrypt:
+        import getpass
+        try:
+            key = password_core.unlock(getpass.getpass("Master password: "))
+        except LookupError as e:
+            sys.exit(f"Error: {e}")
+        if key is None:
+            sys.exit("Error: Incorrect Master Password!")
+        from password_crypto import DecryptionFailure
+        plaintext = iter(result for batch in password_core.decrypt_entries(entries, args.vault) for result in batch)
+
+    for entry in entries:
+        saved = time.strftime("%Y-%m-%d %H:%M", time.localtime(vault.timestamp(entry)))
+        if entry not in live:
+            state = "rotated"
+        elif entry in expired:
+            state = "expired"
+        elif entry in expiring:
+            state = "expiring"
+        else:
+            state = "ok"
+        line = f"{entry}\t{saved}\t{state}"
+        if plaintext is not None:
+            result = next(plaintext)
+            line += "\t" + (f"<{result}>" if isinstance(result, DecryptionFailure) else result)
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate, score, save and list passwords without the GUI.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    gen = commands.add_parser("generate", help="Print random passwords, one per line")
+    gen.add_argument("-n", "--count", type=int, default=1, help="Number of passwords")
+    gen.add_argument("-l", "--length", type=int, default=16, help="Password length")
+    gen.add_argument("--no-lowercase", action="store_true", help="Leave out lowercase letters")
+    gen.add_argument("--no-uppercase", action="store_true", help="Leave out uppercase letters")
+    gen.add_argument("--no-digits", action="store_true", help="Leave out digits")
+    gen.add_argument("--no-special", action="store_true", help="Leave out special characters")
+    gen.add_argument("-w", "--words", type=int, help="Generate diceware passphrases of this many words instead")
+    gen.add_argument("--wordlist", default=password_core.WORDLIST_FILE, help="Text or compiled wordlist for --words")
+    gen.add_argument("--separators", default="-", help="Passphrase separator characters, one picked per gap")
+    gen.add_argument("--capitalize", choices=("lower", "title", "upper", "random"), default="lower")
+    gen.add_argument("--digits", type=int, default=0, help="Length of a digit block inserted into each passphrase (0-18)")
+    gen.set_defaults(run=generate)
+
+    sc = commands.add_parser("score", help="Estimate strength of passwords (arguments or stdin lines)")
+    sc.add_argument("passwords", nargs="*")
+    sc.set_defaults(run=score)
+
+    sv = commands.add_parser("save", help="Encrypt a password into the vault (prompts if not given)")
+    sv.add_argument("password", nargs="?")
+    sv.add_argument("--vault", default=password_core.VAULT_FILE)
+    sv.add_argument("--force", action="store_true", help="Save even if the password is in the breach corpus")
+    sv.set_defaults(run=save)
+
+    ls = commands.add_parser("list", help="List saved entries with their save date and expiry state")
+    ls.add_argument("--vault", default=password_core.VAULT_FILE)
+    ls.add_argument("--all", action="store_true", help="Include expired and rotated entries")
+    ls.add_argument("--decrypt", action="store_true", help="Ask for the master password and show the passwords")
+    ls.set_defaults(run=list_entries)
+
+    ms = commands.add_parser("master", help="Set or change the master password (prompts for it)")
+    ms.set_defaults(run=set_master)
+
+    args = parser.parse_args(argv)
+    args.run(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+import atexit
+import math
+import os
+import time
+
+# GUI-free password generator core shared by password_gen.py and password_cli.py.
+# Feature modules (crypto, vault, KDF, breach corpus, strength estimator, ...)
+# are imported inside the functions that need them, so a plain `generate`
+# only ever loads password_bulk.
+
+# Global variables
+password_expiry_time = 30 * 24 * 60 * 60  # Password expiry in seconds (30 days)
+KEY_FILE = "encryption_key.key"
+VAULT_FILE = "passwords.vault"
+LEGACY_VAULT_FILE = "passwords.txt"  # Imported into the binary vault the first time it is created
+BREACH_CORPUS_FILE = "breached_passwords.bin"  # Built with: python password_breach.py build <dump> <corpus>
+BREACH_BLOOM_FILE = "breached_passwords.bloom"
+UNLOCK_TTL = 5 * 60  # Seconds a successful unlock is remembered
+KDF_TARGET_SECONDS = 0.5  # Cost the master-password KDF is calibrated to on this machine
+EXPIRY_WARNING_WINDOW = 7 * 24 * 60 * 60  # Passwords expiring within a week are listed as expiring soon
+ROTATION_LENGTH = 16
+WORDLIST_FILE = "eff_large_wordlist.txt"  # Text or compiled wordlist for passphrases (see password_wordlist.py)
+
+encryption_key = None
+password_history = None  # SimilarityIndex, created on first use
+vaults = {}
+wordlists = {}
+journals = {}  # Write-behind journal in front of each open vault
+expiry_indexes = {}
+breach_checker = None
+unlock_session = None
+
+
+# Load the encryption key once
+def load_key():
+    global encryption_key
+    if not os.path.exists(KEY_FILE):
+        generate_key()
+    if encryption_key is None:
+        with open(KEY_FILE, "rb") as key_file:
+            encryption_key = key_file.read()
+    return encryption_key
+
+# Generate encryption key if it doesn't exist
+def generate_key():
+    import password_crypto
+    key = password_crypto.generate_key()
+    with open(KEY_FILE, "wb") as key_file:
+        key_file.write(key)
+
+def encrypt_password(password, key):
+    import password_crypto
+    return password_crypto.encrypt(password, key)
+
+def decrypt_password(encrypted_password, key):
+    import password_crypto
+    return password_crypto.decrypt(encrypted_password, key)
+
+# Raises ValueError if no character type is selected or the length cannot hold one of each
+def generate_password(length, use_lowercase=True, use_uppercase=True, use_digits=True, use_special=True):
+    import password_bulk
+    return password_bulk.PasswordGenerator(length, use_lowercase, use_uppercase, use_digits,
+                                           use_special).generate(1)[0]
+
+# Open each wordlist once; a text list is compiled to <file>.bin the first time
+def open_wordlist(path=WORDLIST_FILE):
+    wordlist = wordlists.get(path)
+    if wordlist is None:
+        import password_wordlist
+        wordlist = wordlists[path] = password_wordlist.open_wordlist(path)
+    return wordlist
+
+# Raises ValueError for invalid options and OSError if the wordlist is missing
+def passphrase_generator(words=6, separators="-", capitalization="lower", digits=0, wordlist=WORDLIST_FILE):
+    import password_wordlist
+    return password_wordlist.PassphraseGenerator(open_wordlist(wordlist), words, separators, capitalization, digits)
+
+def generate_passphrase(words=6, separators="-", capitalization="lower", digits=0, wordlist=WORDLIST_FILE):
+    return passphrase_generator(words, separators, capitalization, digits, wordlist).generate(1)[0]
+
+# Strength label for an exact entropy in bits, on the estimator's scale
+def entropy_strength(bits):
+    import password_entropy
+    score = sum(bits >= math.log2(threshold) for threshold in password_entropy.SCORE_THRESHOLDS)
+    return f"{password_entropy.STRENGTH_LABELS[score]} ({bits:.0f} bits)"
+
+def estimate_strength(password):
+    import password_entropy
+    return password_entropy.estimate(password)
+
+# Label shown for a password, e.g. "Strong (74 bits)"
+def password_strength(password):
+    estimate = estimate_strength(password)
+    return f"{estimate.label} ({estimate.bits:.0f} bits)"
+
+# Check against the local breach corpus, if one has been built; opened once and memory-mapped
+def is_breached(password):
+    global breach_checker
+    if breach_checker is None:
+        if not os.path.exists(BREACH_CORPUS_FILE):
+            return False
+        import password_breach
+        breach_checker = password_breach.BreachChecker(BREACH_CORPUS_FILE, BREACH_BLOOM_FILE)
+    return breach_checker.is_breached(password)
+
+def get_password_history():
+    global password_history
+    if password_history is None:
+        from password_similarity import SimilarityIndex
+        password_history = SimilarityIndex()
+    return password_history
+
+# Check similarity to previous passwords (this session's history by default)
+def is_similar_to_previous(password, history=None, threshold=0.8):
+    from password_similarity import SimilarityIndex
+    if history is None:
+        history = get_password_history()
+    elif not isinstance(history, SimilarityIndex):
+        history = SimilarityIndex(history)
+    return history.is_similar(password, threshold)
+
+# Open each vault file once, replaying its journal, and keep it mapped for the rest of the session
+def _open(filename):
+    vault = vaults.get(filename)
+    if vault is None:
+        from password_journal import PasswordJournal
+        from password_vault import PasswordVault
+        legacy = LEGACY_VAULT_FILE if filename == VAULT_FILE else None
+        vault = vaults[filename] = PasswordVault(filename, legacy_path=legacy)
+        if not journals:
+            atexit.register(close_vaults)
+        journals[filename] = PasswordJournal(filename + ".journal", vault)
+    return vault
+
+# The vault for reading, with every password saved so far written into it
+def open_vault(filename=VAULT_FILE):
+    vault = _open(filename)
+    journals[filename].flush()
+    return vault
+
+# Saves go through the journal: they return at once and are fsynced in groups
+def open_journal(filename=VAULT_FILE):
+    _open(filename)
+    return journals[filename]
+
+# Flush and checkpoint every journal; run at exit so queued saves are never lost
+def close_vaults():
+    while journals:
+        filename, journal = journals.popitem()
+        try:
+            journal.close()
+        finally:
+            vaults.pop(filename).close()
+
+# Sorted expiry index kept next to each vault; only entries saved since it was last written get indexed
+def open_expiry_index(filename=VAULT_FILE):
+    index = expiry_indexes.get(filename)
+    if index is None:
+        import password_expiry
+        index = expiry_indexes[filename] = password_expiry.ExpiryIndex(filename + ".expiry", open_vault(filename),
+                                                                      password_expiry_time)
+    return index
+
+# Encrypt and queue a password for the vault; returns its entry number.
+# Call open_journal(filename).flush() when it has to be on disk before going on.
+def save_password(password, filename=VAULT_FILE):
+    encrypted_password = encrypt_password(password, load_key())
+    index = open_expiry_index(filename)
+    timestamp = time.time()  # Saved with the entry for expiry tracking
+    entry = open_journal(filename).append(encrypted_password, timestamp)
+    index.add(entry, timestamp)
+    return entry
+
+# Indices of vault entries that have not expired, straight from the expiry index
+def unexpired_entries(filename=VAULT_FILE):
+    return open_expiry_index(filename).live()
+
+# Stream decrypted entries in batches; failed entries come back as DecryptionFailure
+def decrypt_entries(entries, filename=VAULT_FILE):
+    import password_crypto
+    vault = open_vault(filename)
+    return password_crypto.decrypt_stream((vault.ciphertext(i) for i in entries), load_key())
+
+# Decrypt every entry that has not expired; returns (passwords, failures)
+def load_passwords(filename=VAULT_FILE):
+    from password_crypto import DecryptionFailure
+    decrypted_passwords = []
+    failures = []
+    for batch in decrypt_entries(unexpired_entries(filename), filename):
+        for result in batch:
+            if isinstance(result, DecryptionFailure):
+                failures.append(result)
+            else:
+                decrypted_passwords.append(result)
+    return decrypted_passwords, failures
+
+# Replace every expired password with a newly generated one in one vault write;
+# returns how many were replaced
+def rotate_expired_passwords(filename=VAULT_FILE):
+    import password_bulk
+    index = open_expiry_index(filename)
+    expired = index.expired()
+    if not expired:
+        return 0
+    key = load_key()
+    new_passwords = password_bulk.PasswordGenerator(ROTATION_LENGTH).generate(len(expired))
+    timestamp = time.time()
+    last = open_journal(filename).extend((encrypt_password(password, key), timestamp) for password in new_passwords)
+    index.replace(expired, [(entry, timestamp) for entry in range(last - len(new_passwords) + 1, last + 1)])
+    history = get_password_history()
+    for password in new_passwords:
+        history.append(password)
+    return len(expired)
+
+def has_master_password():
+    return get_unlock_session() is not None
+
+# Master-password record and its unlock session, read from disk once
+def get_unlock_session():
+    global unlock_session
+    if unlock_session is None:
+        import password_kdf
+        record = password_kdf.MasterPasswordRecord.load()
+        if record is None:
+            return None
+        unlock_session = password_kdf.UnlockSession(record, UNLOCK_TTL)
+    return unlock_session
+
+# Calibrate the KDF, persist a new master-password record and start a fresh session.
+# Replacing an existing record needs its password in `current`, checked with the KDF.
+def set_master_password(password, current=None):
+    global unlock_session
+    import password_kdf
+    if len(password) < 8:
+        raise ValueError("Master password must be at least 8 characters long!")
+    existing = password_kdf.MasterPasswordRecord.load()
+    if existing is not None and (current is None or existing.unlock(current) is None):
+        raise ValueError("The current master password is incorrect!")
+    record = password_kdf.MasterPasswordRecord.create(password, params=password_kdf.calibrate(KDF_TARGET_SECONDS))
+    record.save()
+    unlock_session = password_kdf.UnlockSession(record, UNLOCK_TTL)
+
+# The derived master key if the password is right, otherwise None; raises if none is set
+def unlock(password):
+    session = get_unlock_session()
+    if session is None:
+        raise LookupError("Master password not set!")
+    return session.unlock(password)
@@ -0,0 +1,93 @@
+import os
+from collections import deque
+from itertools import islice
+
+# cryptography is imported on first use, and each key's Fernet is built once
+_fernet = None
+_instances = {}
+
+
+def _fernet_module():
+    global _fernet
+    if _fernet is None:
+        from cryptography import fernet
+        _fernet = fernet
+    return _fernet
+
+
+def generate_key():
+    return _fernet_module().Fernet.generate_key()
+
+
+# Fernet for one key, or MultiFernet for several (newest first, older keys only decrypt)
+def get_fernet(key):
+    instance = _instances.get(key)
+    if instance is None:
+        fernet = _fernet_module()
+        if isinstance(key, tuple):
+            instance = fernet.MultiFernet([fernet.Fernet(k) for k in key])
+        else:
+            instance = fernet.Fernet(key)
+        _instances[key] = instance
+    return instance
+
+
+def encrypt(password, key):
+    return get_fernet(key).encrypt(password.encode())
+
+
+def decrypt(token, key):
+    return get_fernet(key).decrypt(token).decode()
+
+
+# A token that could not be decrypted; returned in place of its plaintext
+class DecryptionFailure(Exception):
+    pass
+
+
+# Work unit handed to a pool worker
+def decrypt_batch(key, tokens):
+    fernet = get_fernet(key)
+    results = []
+    for token in tokens:
+        try:
+            results.append(fernet.decrypt(token).decode())
+        except (_fernet.InvalidToken, ValueError) as e:
+            results.append(DecryptionFailure(str(e) or type(e).__name__))
+    return results
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+# Yield lists of plaintexts in input order, batch by batch, so callers can show
+# results before the whole vault is done. Failed tokens come back as
+# DecryptionFailure instances instead of raising. Only a bounded window of
+# batches is in flight, so memory stays flat for any number of tokens.
+# Threads share the cached Fernet; processes=True builds one per worker process.
+def decrypt_stream(tokens, key, workers=None, batch_size=256, processes=False):
+    workers = workers or os.cpu_count() or 1
+    _fernet_module()
+    batches = batched(tokens, batch_size)
+    if workers == 1:
+        for batch in batches:
+            yield decrypt_batch(key, batch)
+        return
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor  # Only needed once something is decrypted
+    pool = (ProcessPoolExecutor if processes else ThreadPoolExecutor)(max_workers=workers)
+    pending = deque()
+    try:
+        for batch in batches:
+            pending.append(pool.submit(decrypt_batch, key, batch))
+            if len(pending) >= workers * 4:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)  # Also when the caller stops early
@@ -0,0 +1,165 @@
+import bisect
+import os
+import struct
+import threading
+import time
+
+# Expiry index layout: a header (magic, password lifetime in seconds, number of
+# vault entries already indexed) followed by <f64 expires at> <u64 vault entry>
+# records sorted by expiry time. Stored next to the vault, so opening the vault
+# only has to index entries appended since the last save.
+MAGIC = b"PWEXPIR1"
+HEADER = struct.Struct("<8sdQ")
+RECORD = struct.Struct("<dQ")
+
+
+class ExpiryStatus:
+    def __init__(self, expired, expiring):
+        self.expired = expired  # Vault entries past their expiry time, oldest first
+        self.expiring = expiring  # Vault entries expiring within the warning window
+
+
+# Live vault entries sorted by expiry time. Every query is a bisect on the
+# sorted expiry list, so no record is read or decrypted to evaluate expiry.
+# Entries removed here (rotated) are simply no longer live.
+class ExpiryIndex:
+    def __init__(self, path, vault, lifetime):
+        self.path = path
+        self.lifetime = lifetime
+        self.lock = threading.RLock()
+        self.expiries = []
+        self.entries = []
+        self.indexed = 0
+        self.version = 0  # Bumped on every change, so sweeps can tell nothing moved
+
+        loaded = self._load()
+        added = list(enumerate(vault.timestamps(self.indexed), self.indexed))
+        if added or not loaded:
+            self.replace((), added)
+        self.indexed = max(self.indexed, len(vault))
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                return False
+            magic, lifetime, indexed = HEADER.unpack(header)
+            if magic != MAGIC or lifetime != self.lifetime:
+                return False  # Different expiry policy: rebuild from the vault timestamps
+            data = f.read()
+        usable = len(data) - len(data) % RECORD.size
+        for expires, entry in RECORD.iter_unpack(data[:usable]):
+            self.expiries.append(expires)
+            self.entries.append(entry)
+        self.indexed = indexed
+        return True
+
+    def save(self):
+        with self.lock:
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, self.lifetime, self.indexed))
+                f.write(b"".join(RECORD.pack(e, i) for e, i in zip(self.expiries, self.entries)))
+            os.replace(temp_path, self.path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    # Index one newly saved vault entry. Entries saved in time order land at
+    # the end, which only appends a record and rewrites the header in place.
+    # Entries the index already picked up from the vault are ignored.
+    def add(self, entry, timestamp):
+        expires = timestamp + self.lifetime
+        with self.lock:
+            if entry < self.indexed:
+                return
+            if self.expiries and expires < self.expiries[-1]:
+                self.indexed = max(self.indexed, entry + 1)
+                self.replace((), [(entry, timestamp)])
+                return
+            self.expiries.append(expires)
+            self.entries.append(entry)
+            self.indexed = max(self.indexed, entry + 1)
+            self.version += 1
+            if not os.path.exists(self.path):
+                self.save()
+                return
+            with open(self.path, "r+b") as f:
+                f.write(HEADER.pack(MAGIC, self.lifetime, self.indexed))
+                f.seek(HEADER.size + (len(self.entries) - 1) * RECORD.size)
+                f.write(RECORD.pack(expires, entry))
+                f.truncate()
+
+    # Drop `removed` entries and index `added` (entry, timestamp) pairs in one rewrite
+    def replace(self, removed, added):
+        with self.lock:
+            removed = set(removed)
+            pairs = [(e, i) for e, i in zip(self.expiries, self.entries) if i not in removed]
+            pairs.extend((timestamp + self.lifetime, i) for i, timestamp in added)
+            pairs.sort()
+            self.expiries = [e for e, _ in pairs]
+            self.entries = [i for _, i in pairs]
+            if added:
+                self.indexed = max(self.indexed, max(i for i, _ in added) + 1)
+            self.version += 1
+            self.save()
+
+    def expired(self, now=None):
+        now = time.time() if now is None else now
+        with self.lock:
+            return self.entries[:bisect.bisect_right(self.expiries, now)]
+
+    # Entries that have not expired yet, in vault order
+    def live(self, now=None):
+        now = time.time() if now is None else now
+        with self.lock:
+            return sorted(self.entries[bisect.bisect_right(self.expiries, now):])
+
+    # (version, end of the expired entries, end of the expiring ones) in the sorted lists
+    def bounds(self, warning_window, now=None):
+        now = time.time() if now is None else now
+        with self.lock:
+            expired_end = bisect.bisect_right(self.expiries, now)
+            return self.version, expired_end, bisect.bisect_right(self.expiries, now + warning_window, expired_end)
+
+    def status(self, warning_window, now=None):
+        with self.lock:
+            _, expired_end, expiring_end = self.bounds(warning_window, now)
+            return ExpiryStatus(self.entries[:expired_end], self.entries[expired_end:expiring_end])
+
+
+# Background thread that re-evaluates expiry every `interval` seconds.
+# A sweep is two bisects; `notify` is only called when the expired or
+# expiring sets actually changed since the previous sweep.
+class ExpirySweeper:
+    def __init__(self, index, notify, warning_window=7 * 24 * 60 * 60, interval=60.0):
+        self.index = index
+        self.notify = notify
+        self.warning_window = warning_window
+        self.interval = interval
+        self.last_bounds = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def sweep(self, now=None):
+        now = time.time() if now is None else now
+        with self.index.lock:
+            bounds = self.index.bounds(self.warning_window, now)
+            if bounds == self.last_bounds:
+                return None
+            self.last_bounds = bounds
+            status = self.index.status(self.warning_window, now)
+        self.notify(status)
+        return status
+
+    def _run(self):
+        while True:
+            self.sweep()
+            if self._stop.wait(self.interval):
+                return
+
+    def stop(self):
+        self._stop.set()
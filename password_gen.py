@@ -1,218 +1,294 @@
-import secrets
-import string
-import difflib
 import tkinter as tk
-from tkinter import messagebox, ttk
-from turtle import mode
-from cryptography.fernet import Fernet
-import hashlib
-import os
+from tkinter import messagebox, simpledialog
+import queue
 import time
 
+import password_core
+from password_core import (EXPIRY_WARNING_WINDOW, VAULT_FILE, is_breached, is_similar_to_previous,
+                           open_expiry_index, password_strength, unexpired_entries)
+
+# Tk front end for password_core. Importing this module only defines the
+# functions below; the window is built when it is run as a script.
+
 # Global variables
-password_history = []
-password_expiry_time = 30 * 24 * 60 * 60  # Password expiry in seconds (30 days)
 dark_mode = True
-master_password_hash = ""
-encryption_key = None
-master_password_salt = None
-
-# Load the encryption key once
-def load_key():
-    global encryption_key
-    if not os.path.exists("encryption_key.key"):
-        generate_key()
-    if encryption_key is None:
-        encryption_key = open("encryption_key.key", "rb").read()
-    return encryption_key
-
-# Generate encryption key if it doesn't exist
-def generate_key():
-    key = Fernet.generate_key()
-    with open("encryption_key.key", "wb") as key_file:
-        key_file.write(key)
-
-# Encrypt the password before saving
-def encrypt_password(password, key):
-    f = Fernet(key)
-    return f.encrypt(password.encode())
-
-# Decrypt the password when loading from file
-def decrypt_password(encrypted_password, key):
-    f = Fernet(key)
-    try:
-        return f.decrypt(encrypted_password).decode()
-    except Exception as e:
-        messagebox.showerror("Decryption Error", f"Failed to decrypt the password: {str(e)}")
-        return None
-
-# Hash the master password with salt
-def hash_password(password):
-    salt = os.urandom(16)
-    return hashlib.sha256(salt + password.encode()).hexdigest(), salt
+expiry_sweeper = None
+expiry_updates = queue.Queue()  # ExpiryStatus objects posted by the sweeper thread
+expiry_summary = None  # (window, label, rotate button) of the open summary dialog
+last_expiry_counts = (0, 0)
+PASSPHRASE_DIGITS = 2  # Length of the digit block "Add digits" inserts
 
 # Function to generate password
 def generate_password(length, use_lowercase=True, use_uppercase=True, use_digits=True, use_special=True):
-    character_set = ""
-    required_chars = []
-
-    if use_lowercase:
-        character_set += string.ascii_lowercase
-        required_chars.append(secrets.choice(string.ascii_lowercase))
-    if use_uppercase:
-        character_set += string.ascii_uppercase
-        required_chars.append(secrets.choice(string.ascii_uppercase))
-    if use_digits:
-        character_set += string.digits
-        required_chars.append(secrets.choice(string.digits))
-    if use_special:
-        character_set += "!@#$%^&*()?|[]~`"
-        required_chars.append(secrets.choice("!@#$%^&*()?|[]~`"))
-
-    if not character_set:
-        messagebox.showerror("Error", "You must select at least one character type!")
-        return None
-    if length < len(required_chars):
-        messagebox.showerror("Error", f"Please enter a valid password length (at least {len(required_chars)}).")
+    try:
+        return password_core.generate_password(length, use_lowercase, use_uppercase, use_digits, use_special)
+    except ValueError as e:
+        messagebox.showerror("Error", str(e))
         return None
 
-    password = required_chars + [secrets.choice(character_set) for _ in range(length - len(required_chars))]
-    secrets.SystemRandom().shuffle(password)
-
-    return ''.join(password)
-
-# Enhanced password strength evaluation
-def password_strength(password):
-    score = 0
-    if len(password) >= 8: score += 1
-    if any(c.islower() for c in password): score += 1
-    if any(c.isupper() for c in password): score += 1
-    if any(c.isdigit() for c in password): score += 1
-    if any(c in "!@#$%^&*()?|[]~`" for c in password): score += 1
-    if len(password) >= 12: score += 1
-    if len(password) >= 16: score += 1
-    if len(set(password)) == len(password): score += 1  # No repeating characters
-
-    strength = {
-        1: "Very Weak",
-        2: "Weak",
-        3: "Moderate",
-        4: "Strong",
-        5: "Very Strong",
-        6: "Excellent",
-        7: "Top-tier"
-    }
-    return strength.get(score, "Invalid")
-
-# Check similarity to previous passwords
-def is_similar_to_previous(password, history, threshold=0.8):
-    for old_password in history:
-        ratio = difflib.SequenceMatcher(None, password, old_password).ratio()
-        if ratio > threshold:
-            return True
-    return False
-
-# Save the encrypted password to a .txt file
-def save_password_to_file(password, filename="passwords.txt"):
-    key = load_key()
-    encrypted_password = encrypt_password(password, key)
-    with open(filename, 'a') as file:
-        file.write(f"{encrypted_password.decode()}:{int(time.time())}\n")  # Save with timestamp for expiry tracking
-    print(f"Password saved to {filename} (encrypted).")
-
-# Load and decrypt passwords from the .txt file
-def load_passwords_from_file():
-    key = load_key()
-    decrypted_passwords = []
-    if os.path.exists("passwords.txt"):
-        with open("passwords.txt", 'r') as file:
-            lines = file.readlines()
-            for line in lines:
-                encrypted_password, timestamp = line.strip().split(":")
-                if time.time() - float(timestamp) > password_expiry_time:
-                    messagebox.showwarning("Password Expired", "A password has expired and should be updated.")
-                    continue
-                decrypted_pwd = decrypt_password(encrypted_password.encode(), key)
-                if decrypted_pwd:
-                    decrypted_passwords.append(decrypted_pwd)
-    return decrypted_passwords
-
-# Set master password dynamically and store its hash and salt
+# Save the encrypted password to the vault
+def save_password_to_file(password, filename=VAULT_FILE):
+    password_core.save_password(password, filename)
+
+# Replace every expired password with a newly generated one in one vault write
+def rotate_expired_passwords():
+    count = password_core.rotate_expired_passwords()
+    if not count:
+        return
+    expiry_sweeper.sweep()
+    messagebox.showinfo("Passwords Rotated", f"Replaced {count} expired password(s) with new ones.")
+
+# Start the background sweeper; its results reach the UI through expiry_updates
+def start_expiry_sweeper():
+    global expiry_sweeper
+    import password_expiry
+    expiry_sweeper = password_expiry.ExpirySweeper(open_expiry_index(), expiry_updates.put, EXPIRY_WARNING_WINDOW)
+    root.after(1000, poll_expiry_updates)
+
+def poll_expiry_updates():
+    global last_expiry_counts
+    status = None
+    try:
+        while True:
+            status = expiry_updates.get_nowait()
+    except queue.Empty:
+        pass
+    if status is not None:
+        counts = (len(status.expired), len(status.expiring))
+        if counts != last_expiry_counts and any(counts):
+            show_expiry_summary(status)
+        last_expiry_counts = counts
+    root.after(1000, poll_expiry_updates)
+
+# One summary dialog for all expired and soon-to-expire passwords, updated in place
+def show_expiry_summary(status):
+    global expiry_summary
+    text = (f"{len(status.expired)} saved password(s) have expired.\n"
+            f"{len(status.expiring)} more expire within {EXPIRY_WARNING_WINDOW // 86400} days.")
+    if expiry_summary is None or not expiry_summary[0].winfo_exists():
+        window = tk.Toplevel(root)
+        window.title("Password Expiry")
+        label = tk.Label(window, justify=tk.LEFT, padx=10, pady=10)
+        label.pack()
+        rotate_button = tk.Button(window, text="Rotate Expired", command=rotate_expired_passwords)
+        rotate_button.pack(side=tk.LEFT, padx=10, pady=10)
+        tk.Button(window, text="Dismiss", command=window.destroy).pack(side=tk.RIGHT, padx=10, pady=10)
+        expiry_summary = (window, label, rotate_button)
+    window, label, rotate_button = expiry_summary
+    label.config(text=text)
+    rotate_button.config(state=tk.NORMAL if status.expired else tk.DISABLED)
+
+# Set master password dynamically and persist its scrypt record; changing it asks for the current one
 def set_master_password():
-    global master_password_hash, master_password_salt
-    entered_password = master_password_entry.get()
-    if len(entered_password) < 8:
-        messagebox.showerror("Error", "Master password must be at least 8 characters long!")
+    current = None
+    if password_core.has_master_password():
+        current = simpledialog.askstring("Change Master Password", "Current master password:", show="*",
+                                         parent=root)
+        if current is None:
+            return
+    try:
+        password_core.set_master_password(master_password_entry.get(), current)
+    except ValueError as e:
+        messagebox.showerror("Error", str(e))
         return
-    master_password_hash, master_password_salt = hash_password(entered_password)  # Store both hash and salt
     messagebox.showinfo("Success", "Master password set successfully!")
     master_password_entry.delete(0, tk.END)  # Clear master password entry
 
-# Master password validation using the stored salt
+# Master password validation; the KDF only runs again once the unlock session expires
 def validate_master_password():
-    global master_password_hash, master_password_salt
     entered_password = master_password_entry.get()
-    if not master_password_salt:
+    session = password_core.get_unlock_session()
+    if session is None:
         messagebox.showerror("Error", "Master password not set!")
         return
-    # Use the stored salt to hash the entered password
-    entered_hash = hashlib.sha256(master_password_salt + entered_password.encode()).hexdigest()
-    if entered_hash == master_password_hash:
+    if session.unlock(entered_password) is not None:
         show_decrypt_window()
     else:
         messagebox.showerror("Error", "Incorrect Master Password!")
 
 
 # Password Decryption Window
+# A virtual list over the vault: only the rows that fit in the window are
+# decrypted and shown, and their plaintext is dropped again as they scroll
+# out of view. The age filter runs a chunk per event-loop tick.
 def show_decrypt_window():
-    decrypted_passwords = load_passwords_from_file()
-    if not decrypted_passwords:
+    import tkinter.font as tkfont
+    import password_view
+    entries = unexpired_entries()
+    if not entries:
         messagebox.showinfo("No Passwords", "No passwords saved yet.")
         return
 
+    view = password_view.VaultView(password_core.open_vault(), entries, password_core.load_key())
+    state = {"top": 0, "rows": 1, "filter": None, "job": None}
+
     decrypt_window = tk.Toplevel(root)
     decrypt_window.title("Decrypted Passwords")
-    decrypt_window.geometry("300x200")
-
-    scrollbar = tk.Scrollbar(decrypt_window)
+    decrypt_window.geometry("420x400")
+
+    filters = tk.Frame(decrypt_window)
+    filters.pack(fill=tk.X, padx=10, pady=(10, 5))
+    newer_var = tk.StringVar()
+    older_var = tk.StringVar()
+    tk.Label(filters, text="Saved within (days):").pack(side=tk.LEFT)
+    tk.Entry(filters, textvariable=newer_var, width=6).pack(side=tk.LEFT, padx=(0, 10))
+    tk.Label(filters, text="Older than (days):").pack(side=tk.LEFT)
+    tk.Entry(filters, textvariable=older_var, width=6).pack(side=tk.LEFT)
+    status = tk.Label(decrypt_window, anchor="w")
+    status.pack(fill=tk.X, padx=10)
+
+    body = tk.Frame(decrypt_window)
+    body.pack(expand=True, fill=tk.BOTH, padx=10, pady=(5, 10))
+    listbox = tk.Listbox(body, activestyle="none", font=("Courier", 11))
+    scrollbar = tk.Scrollbar(body)
     scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    listbox.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+    row_height = tkfont.Font(font=listbox["font"]).metrics("linespace") + 1
+
+    def render():
+        total = len(view)
+        state["top"] = max(0, min(state["top"], total - state["rows"]))
+        lines = []
+        for entry, saved, password in view.rows(state["top"], state["rows"]):
+            if isinstance(password, password_view.DecryptionFailure):
+                password = f"<could not decrypt: {password}>"
+            lines.append(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(saved))}  {password}")
+        listbox.delete(0, tk.END)
+        listbox.insert(tk.END, *lines)
+        scrollbar.set(state["top"] / (total or 1), min(1.0, (state["top"] + state["rows"]) / (total or 1)))
+        text = f"{total} of {len(entries)} entries" + (" (filtering...)" if view.filtering else "")
+        if view.failed:
+            text += f", {len(view.failed)} could not be decrypted"
+        status.config(text=text)
+
+    def scroll_to(top):
+        state["top"] = top
+        render()
+        return "break"
+
+    def on_scroll(action, amount, unit=None):
+        if action == "moveto":
+            scroll_to(int(float(amount) * len(view)))
+        elif unit == "pages":
+            scroll_to(state["top"] + int(amount) * state["rows"])
+        else:
+            scroll_to(state["top"] + int(amount))
 
-    text = tk.Text(decrypt_window, wrap=tk.WORD, yscrollcommand=scrollbar.set)
-    for pwd in decrypted_passwords:
-        text.insert(tk.END, f"{pwd}\n")
-    text.pack(expand=True, fill=tk.BOTH)
+    def on_resize(event):
+        state["rows"] = max(1, event.height // row_height)
+        render()
 
-    scrollbar.config(command=text.yview)
+    def parse_days(text):
+        return float(text) * 86400 if text.strip() else None
+
+    def run_filter():
+        try:
+            next(state["filter"])
+        except StopIteration:
+            state["filter"] = None
+            render()
+            return
+        render()
+        state["job"] = decrypt_window.after(1, run_filter)
+
+    def apply_filter():
+        state["job"] = None
+        try:
+            max_age, min_age = parse_days(newer_var.get()), parse_days(older_var.get())
+        except ValueError:
+            status.config(text="Enter the ages as a number of days")
+            return
+        state["top"] = 0
+        state["filter"] = view.filter(min_age, max_age)
+        run_filter()
+
+    def schedule_filter():
+        if state["job"] is not None:
+            decrypt_window.after_cancel(state["job"])
+        state["job"] = decrypt_window.after(150, apply_filter)
+
+    def on_close():
+        if state["job"] is not None:
+            decrypt_window.after_cancel(state["job"])
+        view.release()
+        decrypt_window.destroy()
+
+    scrollbar.config(command=on_scroll)
+    listbox.bind("<Configure>", on_resize)
+    listbox.bind("<MouseWheel>", lambda e: scroll_to(state["top"] - e.delta // 120 * 3))
+    listbox.bind("<Button-4>", lambda e: scroll_to(state["top"] - 3))
+    listbox.bind("<Button-5>", lambda e: scroll_to(state["top"] + 3))
+    listbox.bind("<Up>", lambda e: scroll_to(state["top"] - 1))
+    listbox.bind("<Down>", lambda e: scroll_to(state["top"] + 1))
+    listbox.bind("<Prior>", lambda e: scroll_to(state["top"] - state["rows"]))
+    listbox.bind("<Next>", lambda e: scroll_to(state["top"] + state["rows"]))
+    newer_var.trace_add("write", lambda *args: schedule_filter())
+    older_var.trace_add("write", lambda *args: schedule_filter())
+    decrypt_window.protocol("WM_DELETE_WINDOW", on_close)
+    render()
 
 # Password Generation GUI
-def generate_password_gui():
+# Passphrase from the wordlist with its exact strength, or None after telling the user why not
+def generate_passphrase():
     try:
-        passlen = int(password_length.get())
-        if passlen < 8 or passlen > 128:
-            messagebox.showerror("Error", "Password length should be between 8 and 128 characters!")
-            return
+        words = int(passphrase_words.get())
+        if words < 3 or words > 20:
+            messagebox.showerror("Error", "A passphrase should have between 3 and 20 words!")
+            return None
     except ValueError:
-        messagebox.showerror("Error", "Please enter a valid number for password length!")
-        return
+        messagebox.showerror("Error", "Please enter a valid number of words!")
+        return None
+    capitalization = "random" if capitals_var.get() else "lower"
+    digits = PASSPHRASE_DIGITS if passphrase_digits_var.get() else 0
+    try:
+        generator = password_core.passphrase_generator(words, separator_entry.get(), capitalization, digits)
+    except OSError:
+        messagebox.showerror("Wordlist Missing", f"No wordlist found at {password_core.WORDLIST_FILE}. "
+                                                 "Download the EFF long wordlist to that file.")
+        return None
+    except ValueError as e:
+        messagebox.showerror("Error", str(e))
+        return None
+    return generator.generate(1)[0], password_core.entropy_strength(generator.bits)
 
-    use_lower = lowercase_var.get()
-    use_upper = uppercase_var.get()
-    use_digits = digits_var.get()
-    use_special = special_var.get()
+def generate_password_gui():
+    if passphrase_var.get():
+        result = generate_passphrase()
+        if result is None:
+            return
+        password, strength = result
+    else:
+        try:
+            passlen = int(password_length.get())
+            if passlen < 8 or passlen > 128:
+                messagebox.showerror("Error", "Password length should be between 8 and 128 characters!")
+                return
+        except ValueError:
+            messagebox.showerror("Error", "Please enter a valid number for password length!")
+            return
 
-    password = generate_password(passlen, use_lower, use_upper, use_digits, use_special)
-    if password:
-        password_output.delete(0, tk.END)
-        password_output.insert(0, password)
+        use_lower = lowercase_var.get()
+        use_upper = uppercase_var.get()
+        use_digits = digits_var.get()
+        use_special = special_var.get()
+
+        password = generate_password(passlen, use_lower, use_upper, use_digits, use_special)
+        if not password:
+            return
         strength = password_strength(password)
-        strength_label.config(text=f"Password Strength: {strength}")
-        
-        if is_similar_to_previous(password, password_history):
-            messagebox.showwarning("Password Similarity", "This password is too similar to a previous one.")
-        else:
-            password_history.append(password)
-            if save_var.get():
-                save_password_to_file(password)
+
+    password_output.delete(0, tk.END)
+    password_output.insert(0, password)
+    strength_label.config(text=f"Password Strength: {strength}")
+
+    if is_breached(password):
+        messagebox.showwarning("Breached Password", "This password appears in a known data breach.")
+    elif is_similar_to_previous(password):
+        messagebox.showwarning("Password Similarity", "This password is too similar to a previous one.")
+    else:
+        password_core.get_password_history().append(password)
+        if save_var.get():
+            save_password_to_file(password)
 
 # Copy password to clipboard
 def copy_to_clipboard():
@@ -252,86 +328,112 @@ def toggle_theme():
                 widget.configure(bg="#FF5722", activebackground="#FF8A65", activeforeground="#FFFFFF")
         dark_mode = True
 
-# Create the main window
-root = tk.Tk()
-root.title("Secure Password Generator")
-root.geometry("500x600")
-root.configure(bg="#282828")  # Set the background color (dark mode by default)
+if __name__ == "__main__":
+    # Create the main window
+    root = tk.Tk()
+    root.title("Secure Password Generator")
+    root.geometry("500x720")
+    root.configure(bg="#282828")  # Set the background color (dark mode by default)
+
+    # Frame to hold all the widgets
+    frame = tk.Frame(root, bg="#282828")
+    frame.pack(expand=True)
+
+    # Labels and input fields
+    label = tk.Label(frame, text="Password Length:", bg="#282828", fg="#ffffff")
+    label.grid(row=0, column=0, padx=10, pady=10)
+
+    password_length = tk.Entry(frame)
+    password_length.grid(row=0, column=1, padx=10, pady=10)
+
+    lowercase_var = tk.BooleanVar(value=True)
+    uppercase_var = tk.BooleanVar(value=True)
+    digits_var = tk.BooleanVar(value=True)
+    special_var = tk.BooleanVar(value=True)
+    save_var = tk.BooleanVar(value=True)
+
+    lowercase_checkbox = tk.Checkbutton(frame, text="Include lowercase", variable=lowercase_var, bg="#282828", fg="#ffffff", selectcolor="#282828")
+    lowercase_checkbox.grid(row=1, column=0, columnspan=2)
+
+    uppercase_checkbox = tk.Checkbutton(frame, text="Include uppercase", variable=uppercase_var, bg="#282828", fg="#ffffff", selectcolor="#282828")
+    uppercase_checkbox.grid(row=2, column=0, columnspan=2)
 
-# Frame to hold all the widgets
-frame = tk.Frame(root, bg="#282828")
-frame.pack(expand=True)
+    digits_checkbox = tk.Checkbutton(frame, text="Include digits", variable=digits_var, bg="#282828", fg="#ffffff", selectcolor="#282828")
+    digits_checkbox.grid(row=3, column=0, columnspan=2)
 
-# Labels and input fields
-label = tk.Label(frame, text="Password Length:", bg="#282828", fg="#ffffff")
-label.grid(row=0, column=0, padx=10, pady=10)
+    special_checkbox = tk.Checkbutton(frame, text="Include special chars", variable=special_var, bg="#282828", fg="#ffffff", selectcolor="#282828")
+    special_checkbox.grid(row=4, column=0, columnspan=2)
 
-password_length = tk.Entry(frame)
-password_length.grid(row=0, column=1, padx=10, pady=10)
+    save_checkbox = tk.Checkbutton(frame, text="Save password", variable=save_var, bg="#282828", fg="#ffffff", selectcolor="#282828")
+    save_checkbox.grid(row=5, column=0, columnspan=2)
 
-lowercase_var = tk.BooleanVar(value=True)
-uppercase_var = tk.BooleanVar(value=True)
-digits_var = tk.BooleanVar(value=True)
-special_var = tk.BooleanVar(value=True)
-save_var = tk.BooleanVar(value=True)
+    # Change the layout of the checkboxes for better alignment
+    lowercase_checkbox.grid(row=1, column=0, sticky='w', padx=10, pady=5)
+    uppercase_checkbox.grid(row=2, column=0, sticky='w', padx=10, pady=5)
+    digits_checkbox.grid(row=3, column=0, sticky='w', padx=10, pady=5)
+    special_checkbox.grid(row=4, column=0, sticky='w', padx=10, pady=5)
+    save_checkbox.grid(row=5, column=0, sticky='w', padx=10, pady=5)
 
-lowercase_checkbox = tk.Checkbutton(frame, text="Include lowercase", variable=lowercase_var, bg="#282828", fg="#ffffff", selectcolor="#282828")
-lowercase_checkbox.grid(row=1, column=0, columnspan=2)
+    # Passphrase options (the length field is ignored in passphrase mode)
+    passphrase_var = tk.BooleanVar(value=False)
+    capitals_var = tk.BooleanVar(value=False)
+    passphrase_digits_var = tk.BooleanVar(value=False)
 
-uppercase_checkbox = tk.Checkbutton(frame, text="Include uppercase", variable=uppercase_var, bg="#282828", fg="#ffffff", selectcolor="#282828")
-uppercase_checkbox.grid(row=2, column=0, columnspan=2)
+    passphrase_checkbox = tk.Checkbutton(frame, text="Passphrase, words:", variable=passphrase_var, bg="#282828", fg="#ffffff", selectcolor="#282828")
+    passphrase_checkbox.grid(row=6, column=0, sticky='w', padx=10, pady=5)
 
-digits_checkbox = tk.Checkbutton(frame, text="Include digits", variable=digits_var, bg="#282828", fg="#ffffff", selectcolor="#282828")
-digits_checkbox.grid(row=3, column=0, columnspan=2)
+    passphrase_words = tk.Entry(frame, width=5)
+    passphrase_words.insert(0, "6")
+    passphrase_words.grid(row=6, column=1, sticky='w', padx=10, pady=5)
 
-special_checkbox = tk.Checkbutton(frame, text="Include special chars", variable=special_var, bg="#282828", fg="#ffffff", selectcolor="#282828")
-special_checkbox.grid(row=4, column=0, columnspan=2)
+    separator_label = tk.Label(frame, text="Separators:", bg="#282828", fg="#ffffff")
+    separator_label.grid(row=7, column=0, sticky='w', padx=10, pady=5)
 
-save_checkbox = tk.Checkbutton(frame, text="Save password", variable=save_var, bg="#282828", fg="#ffffff", selectcolor="#282828")
-save_checkbox.grid(row=5, column=0, columnspan=2)
+    separator_entry = tk.Entry(frame, width=5)
+    separator_entry.insert(0, "-")
+    separator_entry.grid(row=7, column=1, sticky='w', padx=10, pady=5)
 
-# Change the layout of the checkboxes for better alignment
-lowercase_checkbox.grid(row=1, column=0, sticky='w', padx=10, pady=5)
-uppercase_checkbox.grid(row=2, column=0, sticky='w', padx=10, pady=5)
-digits_checkbox.grid(row=3, column=0, sticky='w', padx=10, pady=5)
-special_checkbox.grid(row=4, column=0, sticky='w', padx=10, pady=5)
-save_checkbox.grid(row=5, column=0, sticky='w', padx=10, pady=5)
+    capitals_checkbox = tk.Checkbutton(frame, text="Random capitals", variable=capitals_var, bg="#282828", fg="#ffffff", selectcolor="#282828")
+    capitals_checkbox.grid(row=8, column=0, sticky='w', padx=10, pady=5)
 
-# Output field for generated password
-password_output = tk.Entry(frame, width=30)
-password_output.grid(row=6, column=0, columnspan=2, padx=10, pady=10)
+    passphrase_digits_checkbox = tk.Checkbutton(frame, text="Add digits", variable=passphrase_digits_var, bg="#282828", fg="#ffffff", selectcolor="#282828")
+    passphrase_digits_checkbox.grid(row=8, column=1, sticky='w', padx=10, pady=5)
 
-# Strength label
-strength_label = tk.Label(frame, text="Password Strength:", bg="#282828", fg="#ffffff")
-strength_label.grid(row=7, column=0, columnspan=2, padx=10, pady=10)
+    # Output field for generated password
+    password_output = tk.Entry(frame, width=30)
+    password_output.grid(row=9, column=0, columnspan=2, padx=10, pady=10)
 
-# Generate password button
-generate_button = tk.Button(frame, text="Generate Password", command=generate_password_gui, bg="#FF5722", fg="#ffffff", activebackground="#FF8A65")
-generate_button.grid(row=8, column=0, columnspan=2, padx=10, pady=10)
+    # Strength label
+    strength_label = tk.Label(frame, text="Password Strength:", bg="#282828", fg="#ffffff")
+    strength_label.grid(row=10, column=0, columnspan=2, padx=10, pady=10)
 
-# Copy to clipboard button
-copy_button = tk.Button(frame, text="Copy", command=copy_to_clipboard, bg="#4CAF50", fg="#ffffff", activebackground="#87C28A")
-copy_button.grid(row=9, column=0, columnspan=2, padx=10, pady=10)
+    # Generate password button
+    generate_button = tk.Button(frame, text="Generate Password", command=generate_password_gui, bg="#FF5722", fg="#ffffff", activebackground="#FF8A65")
+    generate_button.grid(row=11, column=0, columnspan=2, padx=10, pady=10)
 
-# Master password section
-master_password_label = tk.Label(frame, text="Set Master Password:", bg="#282828", fg="#ffffff")
-master_password_label.grid(row=10, column=0, padx=10, pady=10)
+    # Copy to clipboard button
+    copy_button = tk.Button(frame, text="Copy", command=copy_to_clipboard, bg="#4CAF50", fg="#ffffff", activebackground="#87C28A")
+    copy_button.grid(row=12, column=0, columnspan=2, padx=10, pady=10)
 
-master_password_entry = tk.Entry(frame, show="*")
-master_password_entry.grid(row=10, column=1, padx=10, pady=10)
+    # Master password section
+    master_password_label = tk.Label(frame, text="Set Master Password:", bg="#282828", fg="#ffffff")
+    master_password_label.grid(row=13, column=0, padx=10, pady=10)
 
-# Set master password button
-set_password_button = tk.Button(frame, text="Set Password", command=set_master_password, bg="#FF5722", fg="#ffffff", activebackground="#FF8A65")
-set_password_button.grid(row=11, column=0, padx=10, pady=10)
+    master_password_entry = tk.Entry(frame, show="*")
+    master_password_entry.grid(row=13, column=1, padx=10, pady=10)
 
-# Validate master password button
-validate_password_button = tk.Button(frame, text="Decrypt Password", command=validate_master_password, bg="#4CAF50", fg="#ffffff", activebackground="#87C28A")
-validate_password_button.grid(row=11, column=1, padx=10, pady=10)
+    # Set master password button
+    set_password_button = tk.Button(frame, text="Set Password", command=set_master_password, bg="#FF5722", fg="#ffffff", activebackground="#FF8A65")
+    set_password_button.grid(row=14, column=0, padx=10, pady=10)
 
-# Toggle theme button
-toggle_theme_button = tk.Button(frame, text="Toggle Theme", command=toggle_theme, bg="#4CAF50", fg="#ffffff", activebackground="#87C28A")
-toggle_theme_button.grid(row=12, column=0, columnspan=2, padx=10, pady=10)
+    # Validate master password button
+    validate_password_button = tk.Button(frame, text="Decrypt Password", command=validate_master_password, bg="#4CAF50", fg="#ffffff", activebackground="#87C28A")
+    validate_password_button.grid(row=14, column=1, padx=10, pady=10)
 
-# Start the application
-root.mainloop()
+    # Toggle theme button
+    toggle_theme_button = tk.Button(frame, text="Toggle Theme", command=toggle_theme, bg="#4CAF50", fg="#ffffff", activebackground="#87C28A")
+    toggle_theme_button.grid(row=15, column=0, columnspan=2, padx=10, pady=10)
 
+    # Start the application
+    start_expiry_sweeper()
+    root.mainloop()
@@ -0,0 +1,207 @@
+import os
+import struct
+import threading
+import time
+import zlib
+
+# Journal layout: a header (magic, format version, base) followed by records of
+#   <u32 crc32> <u32 ciphertext length> <f64 timestamp> <ciphertext>
+# `base` is the vault entry number of the first record, so a replay after a
+# crash skips records the vault already holds. The CRC covers everything after
+# it; the first record that is cut short or fails the check marks a torn tail.
+MAGIC = b"PWJRNL01"
+VERSION = 1
+HEADER = struct.Struct("<8sIQ")
+CRC = struct.Struct("<I")
+BODY = struct.Struct("<Id")
+RECORD_SIZE = CRC.size + BODY.size
+
+
+def encode_record(ciphertext, timestamp):
+    body = BODY.pack(len(ciphertext), timestamp) + ciphertext
+    return CRC.pack(zlib.crc32(body)) + body
+
+
+# Intact (ciphertext, timestamp) records in `data` after the header, and where they end
+def read_records(data):
+    records = []
+    pos = HEADER.size
+    while pos + RECORD_SIZE <= len(data):
+        (crc,) = CRC.unpack_from(data, pos)
+        length, timestamp = BODY.unpack_from(data, pos + CRC.size)
+        end = pos + RECORD_SIZE + length
+        if end > len(data) or zlib.crc32(data[pos + CRC.size:end]) != crc:
+            break
+        records.append((data[pos + RECORD_SIZE:end], timestamp))
+        pos = end
+    return records, pos
+
+
+# Write-behind journal in front of a PasswordVault.
+# append() queues a record and returns its vault entry number at once; a
+# background thread collects everything queued within `interval` seconds (or
+# up to batch_size records), writes it to the journal with a single fsync and
+# then copies it into the vault. The vault is only fsynced at checkpoints,
+# after which the journal is emptied. Once a journal is open, every write to
+# the vault has to go through it, or entry numbers would drift.
+class PasswordJournal:
+    def __init__(self, path, vault, batch_size=1024, interval=0.05, checkpoint_bytes=1 << 20):
+        self.path = path
+        self.vault = vault
+        self.batch_size = batch_size
+        self.interval = interval
+        self.checkpoint_bytes = checkpoint_bytes
+        self.cond = threading.Condition()
+        self.write_lock = threading.Lock()  # Journal file and vault writes
+        self.pending = []  # (ciphertext, timestamp) records not yet handed to the writer
+        self.appended = 0  # Records accepted by append()
+        self.durable = 0  # Records fsynced to the journal and copied into the vault
+        self.flush_requested = False
+        self.error = None
+        self.closed = False
+
+        self.recovered = self._recover()
+        self.file = open(path, "r+b")
+        self.file.seek(0, os.SEEK_END)
+        self.next_entry = len(vault)
+        if self.recovered:
+            self.checkpoint()
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # Replay intact records the vault is missing and cut off a torn tail; returns how many were replayed
+    def _recover(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < HEADER.size:
+            self._reset(len(self.vault))  # New journal, or a crash before its header was written
+            return 0
+        with open(self.path, "r+b") as f:
+            data = f.read()
+            magic, _, base = HEADER.unpack_from(data)
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not a password vault journal")
+            if base > len(self.vault):
+                raise ValueError(f"{self.path} starts at entry {base} but the vault only has {len(self.vault)}")
+            records, end = read_records(data)
+            if end < len(data):
+                f.truncate(end)
+                f.flush()
+                os.fsync(f.fileno())
+        missing = records[len(self.vault) - base:]
+        if missing:
+            self.vault.extend(missing)
+        return len(missing)
+
+    def _reset(self, base):
+        with open(self.path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, base))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def append(self, ciphertext, timestamp=None):
+        return self.extend([(ciphertext, timestamp)])
+
+    # Queue many (ciphertext, timestamp) pairs; returns the vault entry number of the last one.
+    # Blocks while the writer is more than a few batches behind.
+    def extend(self, records):
+        with self.cond:
+            if self.closed:
+                raise ValueError("journal is closed")
+            for ciphertext, timestamp in records:
+                while len(self.pending) >= 8 * self.batch_size and self.error is None:
+                    self.cond.wait()
+                if self.error is not None:
+                    raise self.error
+                self.pending.append((ciphertext, time.time() if timestamp is None else timestamp))
+                self.appended += 1
+                self.next_entry += 1
+                if len(self.pending) == 1 or len(self.pending) >= self.batch_size:
+                    self.cond.notify_all()
+            return self.next_entry - 1
+
+    # Wait until everything appended so far is fsynced to the journal and readable from the vault
+    def flush(self):
+        with self.cond:
+            target = self.appended
+            if self.durable < target:
+                self.flush_requested = True
+                self.cond.notify_all()
+            while self.durable < target and self.error is None:
+                self.cond.wait()
+            if self.error is not None:
+                raise self.error
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.closed:
+                    self.cond.wait()
+                if not self.pending:
+                    return
+                # Let a group build up unless it is already full or someone is waiting for it
+                deadline = time.monotonic() + self.interval
+                while len(self.pending) < self.batch_size and not (self.flush_requested or self.closed):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.cond.wait(remaining)
+                batch = self.pending[:self.batch_size]
+                del self.pending[:self.batch_size]
+                if not self.pending:
+                    self.flush_requested = False
+                self.cond.notify_all()  # Room for blocked appenders
+            try:
+                self._commit(batch)
+            except Exception as e:
+                with self.cond:
+                    self.error = e
+                    self.cond.notify_all()
+                return
+            with self.cond:
+                self.durable += len(batch)
+                self.cond.notify_all()
+
+    def _commit(self, batch):
+        with self.write_lock:
+            self.file.write(b"".join(encode_record(ciphertext, timestamp) for ciphertext, timestamp in batch))
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.vault.extend(batch)
+            if self.file.tell() >= self.checkpoint_bytes:
+                self.checkpoint()
+
+    # Make the vault durable and empty the journal. The records are dropped
+    # before the header moves `base` forward, so a crash in between can never
+    # replay a record twice.
+    def checkpoint(self):
+        with self.write_lock:
+            self.vault.sync()
+            self.file.truncate(HEADER.size)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.seek(0)
+            self.file.write(HEADER.pack(MAGIC, VERSION, len(self.vault)))
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.seek(0, os.SEEK_END)
+
+    def close(self):
+        with self.cond:
+            if self.closed:
+                return
+            self.closed = True
+            self.cond.notify_all()
+        self._thread.join()
+        try:
+            if self.error is None:
+                self.checkpoint()
+        finally:
+            self.file.close()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
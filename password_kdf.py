@@ -0,0 +1,153 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+
+RECORD_FILE = "master_password.json"
+KEY_LENGTH = 32
+VERIFIER_LABEL = b"master-password-verifier"
+MAX_SCRYPT_MEMORY = 256 * 1024 * 1024  # Upper bound calibration may pick for scrypt
+
+# Strong defaults for when no calibration has been run
+DEFAULT_PARAMS = {
+    "scrypt": {"n": 2 ** 15, "r": 8, "p": 1},
+    "pbkdf2_sha256": {"iterations": 600000},
+}
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii")
+
+
+# Derive the master key with the record's algorithm and cost parameters
+def derive_key(password, kdf, salt, params):
+    secret = password.encode()
+    if kdf == "scrypt":
+        n, r, p = params["n"], params["r"], params["p"]
+        return hashlib.scrypt(secret, salt=salt, n=n, r=r, p=p, dklen=KEY_LENGTH,
+                              maxmem=2 * 128 * r * n * p + (1 << 20))
+    if kdf == "pbkdf2_sha256":
+        return hashlib.pbkdf2_hmac("sha256", secret, salt, params["iterations"], KEY_LENGTH)
+    raise ValueError(f"Unknown key derivation function: {kdf}")
+
+
+# Pick cost parameters so one derivation takes about target_seconds on this machine.
+# scrypt doubles n until the target is reached (bounded by max_memory);
+# PBKDF2 scales the iteration count from a timed probe.
+def calibrate(target_seconds=0.5, kdf="scrypt", max_memory=MAX_SCRYPT_MEMORY):
+    salt = os.urandom(16)
+    if kdf == "scrypt":
+        params = {"n": 2 ** 14, "r": 8, "p": 1}
+        while True:
+            started = time.perf_counter()
+            derive_key("calibration", kdf, salt, params)
+            elapsed = time.perf_counter() - started
+            # Cost grows linearly with n: stop once doubling would overshoot by more than it gains
+            if elapsed * 1.5 >= target_seconds or 128 * params["r"] * params["n"] * 2 > max_memory:
+                return params
+            params["n"] *= 2
+    if kdf == "pbkdf2_sha256":
+        probe = 100000
+        started = time.perf_counter()
+        derive_key("calibration", kdf, salt, {"iterations": probe})
+        elapsed = time.perf_counter() - started
+        return {"iterations": max(probe, int(probe * target_seconds / elapsed))}
+    raise ValueError(f"Unknown key derivation function: {kdf}")
+
+
+# Persisted master-password record: algorithm, salt, cost parameters and a
+# verifier (an HMAC keyed with the derived key). Neither the password nor the
+# key itself is stored.
+class MasterPasswordRecord:
+    def __init__(self, kdf, salt, params, verifier):
+        self.kdf = kdf
+        self.salt = salt
+        self.params = params
+        self.verifier = verifier
+
+    @classmethod
+    def create(cls, password, kdf="scrypt", params=None):
+        params = dict(params or DEFAULT_PARAMS[kdf])
+        salt = os.urandom(16)
+        key = derive_key(password, kdf, salt, params)
+        return cls(kdf, salt, params, hmac.new(key, VERIFIER_LABEL, hashlib.sha256).digest())
+
+    # The derived key if the password is right, otherwise None
+    def unlock(self, password):
+        key = derive_key(password, self.kdf, self.salt, self.params)
+        expected = hmac.new(key, VERIFIER_LABEL, hashlib.sha256).digest()
+        return key if hmac.compare_digest(expected, self.verifier) else None
+
+    def to_json(self):
+        return {"kdf": self.kdf, "salt": _b64(self.salt), "params": self.params, "verifier": _b64(self.verifier)}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["kdf"], base64.b64decode(data["salt"]), data["params"], base64.b64decode(data["verifier"]))
+
+    # Written to a temporary file and renamed, so a crash never leaves half a record
+    def save(self, path=RECORD_FILE):
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.to_json(), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path=RECORD_FILE):
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return cls.from_json(json.load(f))
+
+
+# Keeps the derived key in memory for `ttl` seconds after a successful unlock.
+# Within that window the entered password is checked against an HMAC under a
+# random per-session secret instead of running the KDF again, so a right one
+# costs microseconds. A wrong one ends the session and is checked with the
+# KDF, so guessing is never cheaper than without a session. The session
+# secret never leaves memory and is replaced on every unlock.
+class UnlockSession:
+    def __init__(self, record, ttl=300.0):
+        self.record = record
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.secret = None
+        self.tag = None
+        self.key = None
+        self.expires = 0.0
+
+    def active(self):
+        return self.key is not None and time.monotonic() < self.expires
+
+    def _tag(self, password):
+        return hmac.new(self.secret, password.encode(), hashlib.sha256).digest()
+
+    # The derived key if the password is right, otherwise None
+    def unlock(self, password):
+        with self.lock:
+            if self.active():
+                if hmac.compare_digest(self._tag(password), self.tag):
+                    return self.key
+                self._reset()
+        key = self.record.unlock(password)  # Slow on purpose; not under the lock
+        if key is None:
+            return None
+        with self.lock:
+            self.secret = os.urandom(32)
+            self.tag = self._tag(password)
+            self.key = key
+            self.expires = time.monotonic() + self.ttl
+        return key
+
+    def _reset(self):
+        self.secret = self.tag = self.key = None
+        self.expires = 0.0
+
+    def clear(self):
+        with self.lock:
+            self._reset()
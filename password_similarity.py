@@ -0,0 +1,80 @@
+import difflib
+import random
+
+_MASK = (1 << 64) - 1
+
+
+# Near-duplicate index over stored passwords.
+# Each password is reduced to a MinHash signature of its character bigrams and
+# the signature is split into bands; passwords sharing any band land in the
+# same bucket. A lookup only runs SequenceMatcher against passwords from its
+# own buckets, so its cost depends on the number of near matches rather than
+# on the size of the history.
+# LSH is probabilistic: with the default 20 bands of 2 rows a pair above the
+# 0.8 ratio is found well over 99% of the time. Histories up to exact_below
+# entries, and thresholds below min_threshold, are checked exhaustively.
+class SimilarityIndex:
+    def __init__(self, passwords=(), bands=20, rows=2, min_threshold=0.8, exact_below=256, seed=0x5EED):
+        rng = random.Random(seed)
+        # Multiply-add hashes on 64-bit words; only the well-mixed high bits decide the minimum
+        self.hashes = [(rng.getrandbits(64) | 1, rng.getrandbits(64)) for _ in range(bands * rows)]
+        self.bands = bands
+        self.rows = rows
+        self.min_threshold = min_threshold
+        self.exact_below = exact_below
+        self.passwords = []
+        self.buckets = {}  # band key -> password, or list of passwords once shared
+        for password in passwords:
+            self.append(password)
+
+    def __len__(self):
+        return len(self.passwords)
+
+    def __iter__(self):
+        return iter(self.passwords)
+
+    def band_keys(self, password):
+        shingles = {hash(password[i:i + 2]) & _MASK for i in range(len(password) - 1)} or {hash(password) & _MASK}
+        signature = [min([(a * x + b) & _MASK for x in shingles]) for a, b in self.hashes]
+        rows = self.rows
+        return [hash((band, *signature[band * rows:(band + 1) * rows])) for band in range(self.bands)]
+
+    # Same name as list.append so the index can stand in for a plain history list
+    def append(self, password):
+        self.passwords.append(password)
+        buckets = self.buckets
+        for key in self.band_keys(password):
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = password
+            elif type(bucket) is list:
+                bucket.append(password)
+            else:
+                buckets[key] = [bucket, password]
+
+    def candidates(self, password):
+        found = set()
+        for key in self.band_keys(password):
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                continue
+            if type(bucket) is list:
+                found.update(bucket)
+            else:
+                found.add(bucket)
+        return found
+
+    # True if some stored password has a SequenceMatcher ratio above threshold
+    def is_similar(self, password, threshold=0.8):
+        if len(self.passwords) <= self.exact_below or threshold < self.min_threshold:
+            candidates = self.passwords
+        else:
+            candidates = self.candidates(password)
+        matcher = difflib.SequenceMatcher(None, password)
+        for old_password in candidates:
+            # ratio() is 2*matches/total; the cheap upper bounds rule most candidates out first
+            matcher.set_seq2(old_password)
+            if matcher.real_quick_ratio() > threshold and matcher.quick_ratio() > threshold \
+                    and matcher.ratio() > threshold:
+                return True
+        return False
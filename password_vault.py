@@ -0,0 +1,224 @@
+import argparse
+import mmap
+import os
+import struct
+import threading
+import time
+
+# Vault layout: a 16-byte header (magic, format version, reserved) followed by records of
+#   <u32 ciphertext length> <f64 timestamp> <ciphertext>
+# A sidecar index file holds one fixed-size <u64 record offset> <f64 timestamp>
+# entry per record, so counting entries and reading timestamps never touches
+# the records, and any record is found in O(1) without decrypting anything.
+MAGIC = b"PWVAULT1"
+INDEX_MAGIC = b"PWVINDX1"
+VERSION = 1
+HEADER = struct.Struct("<8sII")
+RECORD = struct.Struct("<Id")
+ENTRY = struct.Struct("<Qd")
+
+
+def encode_record(ciphertext, timestamp):
+    return RECORD.pack(len(ciphertext), timestamp) + ciphertext
+
+
+# Parse the old passwords.txt format: one "ciphertext:timestamp" line per password
+def read_text_vault(path):
+    with open(path, "r") as f:
+        for line in f:
+            ciphertext, sep, timestamp = line.strip().rpartition(":")
+            if not sep:
+                continue
+            try:
+                yield ciphertext.encode(), float(timestamp)
+            except ValueError:
+                continue  # Skip lines that never had a valid timestamp
+
+
+# Append-only store of encrypted passwords, read through mmap.
+# Records are never decrypted here: callers get ciphertext for exactly the
+# entries they open, while timestamps come straight from the index.
+class PasswordVault:
+    def __init__(self, path="passwords.vault", legacy_path=None):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.lock = threading.RLock()
+        self.map = None
+        self.index_map = None
+        self.count = 0
+
+        legacy_records = None
+        if not os.path.exists(path):
+            self._create()
+            if legacy_path and os.path.exists(legacy_path):
+                legacy_records = list(read_text_vault(legacy_path))
+        self.file = open(path, "r+b")
+        if self.file.read(HEADER.size)[:len(MAGIC)] != MAGIC:
+            self.file.close()
+            raise ValueError(f"{path} is not a password vault")
+        if not os.path.exists(self.index_path):
+            self._write_index_header()
+        self.index_file = open(self.index_path, "r+b")
+        if self.index_file.read(HEADER.size)[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            self.index_file.close()
+            self._write_index_header()  # Unreadable index: rebuild it from the records
+            self.index_file = open(self.index_path, "r+b")
+        self._recover()
+        if legacy_records:
+            self.extend(legacy_records)
+
+    def _create(self):
+        with open(self.path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0))
+            f.flush()
+            os.fsync(f.fileno())
+        self._write_index_header()
+
+    def _write_index_header(self):
+        with open(self.index_path, "wb") as f:
+            f.write(HEADER.pack(INDEX_MAGIC, VERSION, 0))
+
+    # Bring the index in line with the records after a crash between the two writes,
+    # and truncate a torn record at the end of the vault
+    def _recover(self):
+        size = self.file.seek(0, os.SEEK_END)
+        index_size = self.index_file.seek(0, os.SEEK_END)
+        count = (index_size - HEADER.size) // ENTRY.size
+
+        end = HEADER.size
+        while count:
+            self.index_file.seek(HEADER.size + (count - 1) * ENTRY.size)
+            offset, _ = ENTRY.unpack(self.index_file.read(ENTRY.size))
+            if offset + RECORD.size <= size:
+                self.file.seek(offset)
+                (length, _) = RECORD.unpack(self.file.read(RECORD.size))
+                if offset + RECORD.size + length <= size:
+                    end = offset + RECORD.size + length
+                    break
+            count -= 1
+        self.index_file.truncate(HEADER.size + count * ENTRY.size)
+
+        # Index any complete records written after the last indexed one
+        self.index_file.seek(0, os.SEEK_END)
+        while end + RECORD.size <= size:
+            self.file.seek(end)
+            length, timestamp = RECORD.unpack(self.file.read(RECORD.size))
+            if end + RECORD.size + length > size:
+                break
+            self.index_file.write(ENTRY.pack(end, timestamp))
+            end += RECORD.size + length
+            count += 1
+        self.index_file.flush()
+        if end < size:
+            self.file.truncate(end)
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    # Remap after appends; the maps only ever grow
+    def _maps(self):
+        with self.lock:
+            size = os.fstat(self.file.fileno()).st_size
+            if self.map is None or len(self.map) != size:
+                if self.map is not None:
+                    self.map.close()
+                self.map = mmap.mmap(self.file.fileno(), size, access=mmap.ACCESS_READ)
+            index_size = HEADER.size + self.count * ENTRY.size
+            if self.index_map is None or len(self.index_map) != index_size:
+                if self.index_map is not None:
+                    self.index_map.close()
+                self.index_map = mmap.mmap(self.index_file.fileno(), index_size, access=mmap.ACCESS_READ)
+            return self.map, self.index_map
+
+    def _entry(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("vault index out of range")
+        return ENTRY.unpack_from(self._maps()[1], HEADER.size + index * ENTRY.size)
+
+    def timestamp(self, index):
+        return self._entry(index)[1]
+
+    # Timestamps of entries start..stop in record order, read from the index alone
+    def timestamps(self, start=0, stop=None):
+        stop = self.count if stop is None else min(stop, self.count)
+        index_map = self._maps()[1]
+        return [timestamp for _, timestamp in
+                ENTRY.iter_unpack(index_map[HEADER.size + start * ENTRY.size:HEADER.size + stop * ENTRY.size])]
+
+    def ciphertext(self, index):
+        offset = self._entry(index)[0]
+        data = self._maps()[0]
+        (length, _) = RECORD.unpack_from(data, offset)
+        start = offset + RECORD.size
+        return data[start:start + length]
+
+    def append(self, ciphertext, timestamp=None):
+        return self.extend([(ciphertext, timestamp)])
+
+    # Append many (ciphertext, timestamp) pairs with one write to each file.
+    # Returns the index of the last appended entry.
+    def extend(self, records):
+        with self.lock:
+            end = self.file.seek(0, os.SEEK_END)
+            data = []
+            entries = []
+            for ciphertext, timestamp in records:
+                timestamp = time.time() if timestamp is None else timestamp
+                record = encode_record(ciphertext, timestamp)
+                data.append(record)
+                entries.append(ENTRY.pack(end, timestamp))
+                end += len(record)
+            # Records first: an index entry must never point past the end of the vault
+            self.file.write(b"".join(data))
+            self.file.flush()
+            self.index_file.seek(0, os.SEEK_END)
+            self.index_file.write(b"".join(entries))
+            self.index_file.flush()
+            self.count += len(entries)
+            return self.count - 1
+
+    # Force appended records and their index entries to disk
+    def sync(self):
+        with self.lock:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.index_file.flush()
+            os.fsync(self.index_file.fileno())
+
+    def close(self):
+        with self.lock:
+            for m in (self.map, self.index_map):
+                if m is not None:
+                    m.close()
+            self.map = self.index_map = None
+            self.file.close()
+            self.index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# One-shot conversion of a passwords.txt text vault; returns the number of entries copied
+def migrate_text_vault(text_path="passwords.txt", vault_path="passwords.vault"):
+    with PasswordVault(vault_path) as vault:
+        before = len(vault)
+        vault.extend(read_text_vault(text_path))
+        return len(vault) - before
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a passwords.txt text vault to the binary vault format.")
+    parser.add_argument("source", nargs="?", default="passwords.txt")
+    parser.add_argument("destination", nargs="?", default="passwords.vault")
+    args = parser.parse_args(argv)
+    count = migrate_text_vault(args.source, args.destination)
+    print(f"Migrated {count} entries from {args.source} to {args.destination}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import time
+from array import array
+
+import password_crypto
+from password_crypto import DecryptionFailure
+
+
+# Paged view over vault entries for the decrypted-password viewer.
+# Matching entries are kept as a compact array of entry numbers; only the
+# rows currently on screen are decrypted, and their plaintext is dropped as
+# soon as they leave the visible window, so memory does not grow with the
+# vault. Age filters read the timestamps from the vault index and never
+# decrypt anything.
+class VaultView:
+    def __init__(self, vault, entries, key):
+        self.vault = vault
+        self.key = key
+        self.all_entries = entries  # Ascending entry numbers, e.g. ExpiryIndex.live()
+        self.entries = array("Q", entries)
+        self.filtering = False
+        self.visible = {}  # entry -> plaintext (or DecryptionFailure) for the rows on screen
+        self.failed = set()  # Entries that could not be decrypted
+
+    def __len__(self):
+        return len(self.entries)
+
+    # Restrict the view to entries saved between max_age and min_age seconds ago
+    # (None leaves that side open). Returns a generator that filters chunk_size
+    # entries per step, so a caller can run it across event-loop ticks and show
+    # matches as they are found; the view fills in as it is consumed.
+    def filter(self, min_age=None, max_age=None, now=None, chunk_size=5000):
+        now = time.time() if now is None else now
+        newest = float("inf") if min_age is None else now - min_age
+        oldest = float("-inf") if max_age is None else now - max_age
+        self.entries = array("Q")
+        self.release()
+        return self._filter(oldest, newest, chunk_size)
+
+    def _filter(self, oldest, newest, chunk_size):
+        entries = self.entries
+        self.filtering = True
+        try:
+            for start in range(0, len(self.all_entries), chunk_size):
+                if entries is not self.entries:
+                    return  # A newer filter replaced this one
+                chunk = self.all_entries[start:start + chunk_size]
+                # Entry numbers are ascending, so one read of the index covers the chunk
+                first = chunk[0]
+                stamps = self.vault.timestamps(first, chunk[-1] + 1)
+                entries.extend(entry for entry in chunk if oldest <= stamps[entry - first] <= newest)
+                yield len(entries)
+        finally:
+            if entries is self.entries:
+                self.filtering = False
+
+    # (entry, saved at, plaintext or DecryptionFailure) for rows top..top+count.
+    # Rows already on screen are reused; everything else that was decrypted is dropped.
+    def rows(self, top, count):
+        window = self.entries[top:top + count]
+        missing = [entry for entry in window if entry not in self.visible]
+        decrypted = password_crypto.decrypt_batch(self.key, [self.vault.ciphertext(entry) for entry in missing])
+        self.failed.update(entry for entry, result in zip(missing, decrypted) if isinstance(result, DecryptionFailure))
+        visible = {entry: self.visible.get(entry) for entry in window if entry in self.visible}
+        visible.update(zip(missing, decrypted))
+        self.visible = visible
+        return [(entry, self.vault.timestamp(entry), visible[entry]) for entry in window]
+
+    # Forget all decrypted plaintext
+    def release(self):
+        self.visible = {}
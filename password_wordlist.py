@@ -0,0 +1,252 @@
+import argparse
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+# Compiled wordlist layout: a header (magic, format version, word count, number
+# of words whose first letter has an upper-case form) followed by count + 1
+# little-endian u32 offsets and the UTF-8 words back to back. Word i is the
+# bytes between offsets i and i + 1, so a lookup is one unpack and one slice
+# of the memory map and no per-word Python objects exist until a word is picked.
+MAGIC = b"PWWORDS1"
+VERSION = 1
+HEADER = struct.Struct("<8sIQQ")
+OFFSETS = struct.Struct("<II")
+OFFSET_SIZE = 4
+DEFAULT_WORDLIST = "eff_large_wordlist.txt"  # https://www.eff.org/dice
+CAPITALIZATION = ("lower", "title", "upper", "random")
+MAX_DIGITS = 18  # 10 ** 18 < 2 ** 64, so a digit block is a single random_below draw
+
+
+def capitalize(word):
+    return word[:1].upper() + word[1:]
+
+
+# Distinct lower-cased words from a text list, in file order. Accepts plain
+# one-word-per-line lists and EFF/diceware "<dice roll> <word>" lines. Words
+# containing digits or spaces are left out, so an injected digit block and
+# the word boundaries can always be told apart.
+def read_words(path):
+    seen = set()
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) == 2 and fields[0].isdigit():
+                fields = fields[1:]
+            if len(fields) != 1 or fields[0].startswith("#"):
+                continue
+            word = fields[0].lower()
+            if word in seen or any(ch.isdigit() for ch in word):
+                continue
+            seen.add(word)
+            yield word
+
+
+# Compile a text wordlist; returns the number of words written
+def build_wordlist(source_path, output_path):
+    offsets = array("I", [0])
+    data = bytearray()
+    cased = 0
+    for word in read_words(source_path):
+        data += word.encode("utf-8")
+        if len(data) >= 1 << 32:
+            raise ValueError(f"{source_path} is too large for a compiled wordlist (4 GiB of words)")
+        offsets.append(len(data))
+        cased += capitalize(word) != word
+    count = len(offsets) - 1
+    if not count:
+        raise ValueError(f"{source_path} contains no usable words")
+    if sys.byteorder == "big":
+        offsets.byteswap()
+    temp_path = output_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, count, cased))
+        f.write(offsets.tobytes())
+        f.write(data)
+    os.replace(temp_path, output_path)
+    return count
+
+
+# Read-only, memory-mapped view of a compiled wordlist
+class Wordlist:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        header = self.file.read(HEADER.size)
+        if len(header) < HEADER.size or HEADER.unpack(header)[0] != MAGIC:
+            self.file.close()
+            raise ValueError(f"{path} is not a compiled wordlist")
+        _, _, self.count, self.cased = HEADER.unpack(header)
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.words_start = HEADER.size + (self.count + 1) * OFFSET_SIZE
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError("wordlist index out of range")
+        start, end = OFFSETS.unpack_from(self.map, HEADER.size + index * OFFSET_SIZE)
+        return self.map[self.words_start + start:self.words_start + end].decode("utf-8")
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Open a compiled wordlist, or a text list compiled on first use to <path>.bin
+# (rebuilt whenever the text file is newer)
+def open_wordlist(path=DEFAULT_WORDLIST):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) == MAGIC:
+            return Wordlist(path)
+    compiled = path + ".bin"
+    if not os.path.exists(compiled) or os.path.getmtime(compiled) < os.path.getmtime(path):
+        build_wordlist(path, compiled)
+    return Wordlist(compiled)
+
+
+# `count` independent uniform integers in [0, n) from one os.urandom read
+# (64-bit draws at or above the largest multiple of n are rejected, so no modulo bias)
+def random_below(n, count):
+    if not 0 < n <= 1 << 64:
+        raise ValueError(f"random_below needs 0 < n <= 2**64, got {n}")
+    limit = (1 << 64) - (1 << 64) % n
+    values = []
+    while len(values) < count:
+        draws = array("Q", os.urandom(8 * (count - len(values) + 4)))
+        values.extend(v % n for v in draws if v < limit)
+    del values[count:]
+    return values
+
+
+# Diceware-style passphrases: `words` uniformly chosen words, each gap filled
+# with one character picked from `separators`, optionally a block of `digits`
+# random digits inserted as an extra token at a random position.
+# Separators are never letters or digits and words containing a separator
+# character are left out, so a passphrase always splits back into its tokens.
+# `bits` is the exact Shannon entropy of that process; random capitalization
+# adds one bit only for words whose first letter actually changes case.
+class PassphraseGenerator:
+    def __init__(self, wordlist, words=6, separators="-", capitalization="lower", digits=0):
+        if words < 1:
+            raise ValueError("Please enter a valid number of words (at least 1).")
+        if not 0 <= digits <= MAX_DIGITS:
+            raise ValueError(f"The number of digits must be between 0 and {MAX_DIGITS}.")
+        if not separators:
+            raise ValueError("Please enter at least one separator character.")
+        if any(ch.isalnum() for ch in separators):
+            raise ValueError("Separators cannot be letters or digits.")
+        if capitalization not in CAPITALIZATION:
+            raise ValueError(f"Capitalization must be one of: {', '.join(CAPITALIZATION)}")
+        if not len(wordlist):
+            raise ValueError("The wordlist is empty.")
+        self.wordlist = wordlist
+        self.words = words
+        self.separators = "".join(dict.fromkeys(separators))  # Duplicates would only look like extra entropy
+        self.capitalization = capitalization
+        self.digits = digits
+
+        # Positions of the usable words, or None when every word is usable
+        separator_set = set(self.separators)
+        usable = [i for i in range(len(wordlist)) if separator_set.isdisjoint(wordlist[i])]
+        if not usable:
+            raise ValueError("Every word in the wordlist contains a separator character.")
+        self.choices = None if len(usable) == len(wordlist) else array("I", usable)
+        n = len(usable)
+        cased = wordlist.cased
+        if self.choices is not None:
+            cased = sum(capitalize(wordlist[i]) != wordlist[i] for i in usable)
+
+        per_word = math.log2(n) + (cased / n if capitalization == "random" else 0.0)
+        gaps = words - 1 + (1 if digits else 0)
+        self.bits = words * per_word + gaps * math.log2(len(self.separators))
+        if digits:
+            self.bits += digits * math.log2(10) + math.log2(words + 1)
+
+    # Exactly `count` passphrases
+    def generate(self, count):
+        words, digits, separators = self.words, self.digits, self.separators
+        wordlist = self.wordlist
+        if self.choices is None:
+            picks = random_below(len(wordlist), count * words)
+        else:
+            picks = [self.choices[pick] for pick in random_below(len(self.choices), count * words)]
+        capitals = random_below(2, count * words) if self.capitalization == "random" else None
+        gaps = words - 1 + (1 if digits else 0)
+        gap_picks = random_below(len(separators), count * gaps) if len(separators) > 1 and gaps else None
+        if digits:
+            positions = random_below(words + 1, count)
+            numbers = random_below(10 ** digits, count)
+
+        passphrases = []
+        for i in range(count):
+            tokens = [wordlist[index] for index in picks[i * words:(i + 1) * words]]
+            if self.capitalization == "title":
+                tokens = [capitalize(word) for word in tokens]
+            elif self.capitalization == "upper":
+                tokens = [word.upper() for word in tokens]
+            elif capitals is not None:
+                tokens = [capitalize(word) if bit else word
+                          for word, bit in zip(tokens, capitals[i * words:(i + 1) * words])]
+            if digits:
+                tokens.insert(positions[i], f"{numbers[i]:0{digits}d}")
+            if gap_picks is None:
+                passphrases.append(separators.join(tokens))
+            else:
+                chosen = gap_picks[i * gaps:(i + 1) * gaps]
+                passphrases.append(tokens[0] + "".join(separators[s] + token for s, token in zip(chosen, tokens[1:])))
+        return passphrases
+
+    # Yield lists of at most batch_size passphrases until `count` have been produced
+    def stream(self, count, batch_size=10000):
+        remaining = count
+        while remaining > 0:
+            batch = self.generate(min(batch_size, remaining))
+            remaining -= len(batch)
+            yield batch
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile a wordlist or generate diceware passphrases from one.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Compile a text wordlist into the memory-mapped format")
+    build.add_argument("source", help="One word per line, or EFF/diceware '<roll> <word>' lines")
+    build.add_argument("output")
+    gen = commands.add_parser("generate", help="Print passphrases, one per line")
+    gen.add_argument("wordlist", nargs="?", default=DEFAULT_WORDLIST, help="Text or compiled wordlist")
+    gen.add_argument("-n", "--count", type=int, default=1, help="Number of passphrases")
+    gen.add_argument("-w", "--words", type=int, default=6, help="Words per passphrase")
+    gen.add_argument("-s", "--separators", default="-", help="Separator characters, one picked per gap")
+    gen.add_argument("-c", "--capitalize", choices=CAPITALIZATION, default="lower")
+    gen.add_argument("-d", "--digits", type=int, default=0,
+                     help=f"Length of a digit block inserted at random (0-{MAX_DIGITS})")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        started = time.perf_counter()
+        count = build_wordlist(args.source, args.output)
+        print(f"Wrote {count} words to {args.output} in {time.perf_counter() - started:.1f}s")
+        return
+
+    try:
+        with open_wordlist(args.wordlist) as wordlist:
+            generator = PassphraseGenerator(wordlist, args.words, args.separators, args.capitalize, args.digits)
+            for batch in generator.stream(args.count):
+                sys.stdout.write("\n".join(batch) + "\n")
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    print(f"{generator.bits:.1f} bits of entropy per passphrase ({len(wordlist)} words)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
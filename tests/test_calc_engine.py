@@ -0,0 +1,103 @@
+import os
+import sys
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import calc_engine
+
+
+def test_exact_modes_read_literals_from_their_text():
+    expression = "12345678901234567.89+0.01"
+    assert str(calc_engine.calculate(expression, exact='decimal')) == "12345678901234567.9"
+    assert calc_engine.calculate(expression, exact='fraction') == Fraction(123456789012345679, 10)
+
+
+def test_exact_modes_keep_digits_beyond_float_precision():
+    compiled = calc_engine.compile_expression("0.1000000000000000000001*10")
+    assert compiled.evaluate_exact('decimal') == Decimal("1.000000000000000000001")
+    assert compiled.evaluate_exact('fraction') == Fraction(1000000000000000000001, 10 ** 21)
+
+
+def test_exact_modes_fix_float_rounding():
+    assert str(calc_engine.calculate("0.1+0.2", exact='decimal')) == "0.3"
+    assert calc_engine.calculate("0.1+0.2", exact='fraction') == Fraction(3, 10)
+    assert calc_engine.calculate("0.1+0.2") == 0.3
+
+
+def test_oversize_factorials_are_rejected_before_computing():
+    for expression in ("fact(1000000)", "nCr(1000000, 500000)", "nPr(1000000, 100000)"):
+        with pytest.raises(calc_engine.ExpressionError):
+            calc_engine.calculate(expression)
+    assert calc_engine.calculate("fact(10)") == 3628800
+    assert calc_engine.calculate("nCr(1000000, 3)") == 166666166667000000
+
+
+def test_oversize_powers_are_not_folded():
+    compiled = calc_engine.compile_expression("9**9**9")
+    assert ('pow',) in compiled.optimized
+    with pytest.raises(calc_engine.ExpressionError):
+        compiled.evaluate()
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("2+3*4", 14),
+    ("(2+3)*4", 20),
+    ("10-4-3", 3),
+    ("8/4/2", 1),
+    ("-2**2", -4),
+    ("2**-1", 0.5),
+    ("2^3^2", 512),
+    ("--3", 3),
+    ("sqrt(16)+nCr(5, 2)", 14),
+])
+def test_precedence_follows_python(expression, expected):
+    assert calc_engine.evaluate(expression) == expected
+
+
+@pytest.mark.parametrize("expression", ["", "2+", "(1+2", "1+2)", "2 $ 3", "foo(1)", "nCr(5)", "sin(1, 2)"])
+def test_malformed_expressions_raise_expression_error(expression):
+    with pytest.raises(calc_engine.ExpressionError):
+        calc_engine.evaluate(expression)
+
+
+def test_unbound_variables_raise_expression_error():
+    with pytest.raises(calc_engine.ExpressionError):
+        calc_engine.evaluate("x+1")
+    assert calc_engine.evaluate("x*x+x", variables={"x": 3}) == 12
+
+
+def test_deep_expressions_never_raise_recursion_error():
+    with pytest.raises(calc_engine.ExpressionError):
+        calc_engine.evaluate("(" * 5000 + "1" + ")" * 5000)
+    assert calc_engine.evaluate("M" + "+1" * 3000, variables={"M": 1}) == 3001
+    with pytest.raises(ZeroDivisionError):
+        calc_engine.evaluate("1/0" + "+x" * 3000, variables={"x": 1})
+
+
+def test_optimize_folds_constants_and_shares_subexpressions():
+    compiled = calc_engine.compile_expression("(x+1)*(x+1)+2*3")
+    assert ('const', 6) in compiled.optimized
+    assert sum(op == ('add',) for op in compiled.optimized) == 2
+    assert compiled.evaluate({"x": 2}) == 15
+    # A failing constant sub-tree is left for evaluation to report
+    assert ('div',) in calc_engine.compile_expression("1/0").optimized
+
+
+def test_incremental_tokenizer_matches_a_full_scan():
+    tokenizer = calc_engine.IncrementalTokenizer()
+    for text in ["1", "12", "123", "123+", "123+sin(", "123+sin(30)", "12+sin(30)", "12*sin(30)", "", "4.5"]:
+        assert tokenizer.tokenize(text) == calc_engine.tokenize(text)
+
+
+def test_cache_counts_hits_and_evicts_oldest():
+    cache = calc_engine.ExpressionCache(maxsize=2)
+    first = cache.get("1 + 1")
+    assert cache.get("  1  +   1 ") is first  # Re-spaced input shares the entry
+    cache.get("2+2")
+    cache.get("3+3")
+    assert cache.stats() == {'hits': 1, 'misses': 3, 'size': 2, 'maxsize': 2}
+    assert "1 + 1" not in cache.entries
@@ -0,0 +1,123 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calc_history import HEADER_SIZE, HistoryIndex, HistoryJournal, encode_record
+
+
+def make_index():
+    index = HistoryIndex()
+    index.extend(["2+5 = 7", "5*5 = 25", "sin(30) = 0.5", "10-3 = 7"])
+    return index
+
+
+def test_short_query_matches_anywhere():
+    index = make_index()
+    assert index.search("5") == [2, 1, 0]
+    assert index.search("= 7") == [3, 0]
+    assert index.search("+5") == [0]
+    assert index.search("IN") == [2]
+
+
+def test_long_query_matches_anywhere():
+    index = make_index()
+    assert index.search("2+5") == [0]
+    assert index.search("= 7") == [3, 0]
+    assert index.search("SIN(3") == [2]
+    assert index.search("xyz") == []
+
+
+def test_shorter_query_never_finds_fewer_entries():
+    index = make_index()
+    for query in ("2+5", "sin(30)", "= 25"):
+        for length in range(1, len(query)):
+            assert set(index.search(query)) <= set(index.search(query[:length]))
+
+
+def test_added_entries_are_searchable():
+    index = make_index()
+    entry = index.add("7+7 = 14")
+    assert index.search("7")[0] == entry
+    assert index.search("14") == [entry]
+    assert list(index.search("", limit=2)) == [entry, 3]
+
+
+def open_journal(path, **options):
+    return HistoryJournal(str(path), compact_interval=3600, **options)
+
+
+def test_journal_reopens_with_its_entries(tmp_path):
+    path = tmp_path / "history.jnl"
+    journal = open_journal(path)
+    for i in range(5):
+        journal.append(f"{i}+{i} = {2 * i}")
+    journal.close()
+    journal = open_journal(path)
+    assert list(journal) == [f"{i}+{i} = {2 * i}" for i in range(5)]
+    journal.close()
+
+
+def test_torn_tail_is_truncated_on_open(tmp_path):
+    path = tmp_path / "history.jnl"
+    journal = open_journal(path)
+    journal.append("1+1 = 2")
+    journal.append("2+2 = 4")
+    journal.close()
+    intact = path.stat().st_size
+    with open(path, "ab") as f:
+        f.write(encode_record("3+3 = 6")[:-3])  # Crash in the middle of an append
+    journal = open_journal(path)
+    assert list(journal) == ["1+1 = 2", "2+2 = 4"]
+    assert path.stat().st_size == intact
+    journal.append("4+4 = 8")
+    journal.close()
+    assert list(open_journal(path)) == ["1+1 = 2", "2+2 = 4", "4+4 = 8"]
+
+
+def test_older_entries_are_paged_in_on_demand(tmp_path):
+    path = tmp_path / "history.jnl"
+    journal = open_journal(path)
+    for i in range(50):
+        journal.append(str(i))
+    journal.close()
+    journal = open_journal(path, tail_size=10)
+    assert list(journal) == [str(i) for i in range(40, 50)]
+    assert journal.has_more()
+    assert journal.load_older(15) == [str(i) for i in range(25, 40)]
+    assert journal.load_all() == [str(i) for i in range(50)]
+    assert not journal.has_more()
+    journal.close()
+
+
+def test_compaction_keeps_the_newest_entries(tmp_path):
+    path = tmp_path / "history.jnl"
+    journal = open_journal(path, max_entries=10)
+    for i in range(30):
+        journal.append(str(i))
+    journal.compact()
+    assert list(journal) == [str(i) for i in range(20, 30)]
+    journal.close()
+
+    # Only part of the history is loaded: the rest stays pageable after compacting
+    for i in range(30, 40):
+        with open(path, "ab") as f:
+            f.write(encode_record(str(i)))
+    journal = open_journal(path, max_entries=10, tail_size=5)
+    journal.compact()
+    assert list(journal) == [str(i) for i in range(35, 40)]
+    assert journal.load_all() == [str(i) for i in range(30, 40)]
+    journal.append("40")
+    journal.close()
+    journal = open_journal(path)
+    assert list(journal) == [str(i) for i in range(30, 41)]
+    journal.close()
+
+
+def test_legacy_text_history_is_imported(tmp_path):
+    legacy = tmp_path / "calculator_history.txt"
+    legacy.write_text("1+1 = 2\n2*3 = 6\n")
+    journal = open_journal(tmp_path / "history.jnl", legacy_path=str(legacy))
+    assert list(journal) == ["1+1 = 2", "2*3 = 6"]
+    journal.close()
+    assert (tmp_path / "history.jnl").read_bytes()[:HEADER_SIZE] == b"CALCJNL1"
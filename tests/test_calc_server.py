@@ -0,0 +1,26 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calc_server import evaluate_item, valid_item
+
+
+def test_well_formed_items_are_accepted():
+    assert valid_item({"expr": "2+3"})
+    assert valid_item({"expr": "0.1+0.2", "exact": "fraction", "precision": 50})
+    assert valid_item({"function": "sin", "value": 30})
+    assert valid_item({"function": "√", "value": 16.0})
+
+
+def test_malformed_items_are_rejected():
+    for item in ({"expr": 5}, {"expr": None}, ["2+3"], "2+3", {"expr": "1", "exact": "binary"},
+                 {"expr": "1", "precision": "50"}, {"expr": "1", "precision": True},
+                 {"function": "nope", "value": 1}, {"function": "sin", "value": "30"}, {"function": 3}):
+        assert not valid_item(item)
+
+
+def test_evaluate_item_clamps_precision():
+    assert evaluate_item({"expr": "1/3", "exact": "decimal", "precision": 10 ** 9}) == {"result": "0.3333"}
+    assert evaluate_item({"expr": "2+3"}) == {"result": "5"}
+    assert "error" in evaluate_item({"expr": "1/0"})
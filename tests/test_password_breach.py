@@ -0,0 +1,79 @@
+import hashlib
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import password_breach
+from password_breach import BreachChecker
+
+
+def write_dump(path, passwords):
+    with open(path, "w") as f:
+        f.write("# header line\n")
+        for password in passwords:
+            f.write(f"{hashlib.sha1(password.encode()).hexdigest().upper()}:12\n")
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    dump = str(tmp_path / "dump.txt")
+    write_dump(dump, [f"pw{i}" for i in range(3000)] + ["pw1", "pw2"])  # Duplicates are dropped
+    path = str(tmp_path / "corpus.bin")
+    assert password_breach.build_corpus(dump, path, run_size=700) == 3000
+    return path
+
+
+def test_lookup_finds_every_corpus_password(corpus):
+    with BreachChecker(corpus) as checker:
+        assert len(checker) == 3000
+        assert all(checker.is_breached(f"pw{i}") for i in range(3000))
+        assert not any(checker.is_breached(f"other{i}") for i in range(3000))
+
+
+def test_corpus_is_sorted_without_duplicates(corpus):
+    with open(corpus, "rb") as f:
+        f.seek(password_breach.HEADER.size)
+        digests = list(password_breach.iter_digests(f))
+    assert digests == sorted(set(digests))
+
+
+def test_bloom_filter_never_hides_a_breached_password(corpus, tmp_path):
+    bloom = str(tmp_path / "corpus.bloom")
+    password_breach.build_bloom(corpus, bloom)
+    with BreachChecker(corpus, bloom) as checker:
+        assert checker.bloom is not None and not checker.bloom_stale
+        assert all(checker.is_breached(f"pw{i}") for i in range(3000))
+        passed = sum(checker._maybe_present(password_breach.password_digest(f"other{i}")) for i in range(3000))
+        assert passed < 150  # About 1% false positives at 10 bits per digest
+
+
+def test_bloom_filter_of_another_corpus_is_ignored(corpus, tmp_path):
+    bloom = str(tmp_path / "corpus.bloom")
+    password_breach.build_bloom(corpus, bloom)
+    dump = str(tmp_path / "dump2.txt")
+    write_dump(dump, ["fresh-password"])
+    password_breach.build_corpus(dump, corpus)
+    with BreachChecker(corpus, bloom) as checker:
+        assert checker.bloom is None and checker.bloom_stale
+        assert checker.is_breached("fresh-password")
+
+
+def test_files_of_the_wrong_kind_are_rejected(corpus, tmp_path):
+    junk = tmp_path / "junk.bin"
+    junk.write_bytes(b"not a corpus at all")
+    with pytest.raises(ValueError):
+        BreachChecker(str(junk))
+    with pytest.raises(ValueError):
+        BreachChecker(corpus, str(junk))
+
+
+def test_empty_corpus_contains_nothing(tmp_path):
+    dump = str(tmp_path / "empty.txt")
+    write_dump(dump, [])
+    path = str(tmp_path / "empty.bin")
+    assert password_breach.build_corpus(dump, path) == 0
+    with BreachChecker(path) as checker:
+        assert not checker.is_breached("password")
@@ -0,0 +1,47 @@
+import os
+import string
+import sys
+from collections import Counter
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_bulk import SPECIAL_CHARACTERS, PasswordGenerator
+
+
+def test_every_password_has_each_selected_class():
+    generator = PasswordGenerator(8, use_numpy=False)
+    passwords = generator.generate(2000)
+    assert len(passwords) == 2000
+    for password in passwords:
+        assert len(password) == 8
+        for chars in (string.ascii_lowercase, string.ascii_uppercase, string.digits, SPECIAL_CHARACTERS):
+            assert any(c in chars for c in password)
+
+
+def test_only_selected_classes_are_used():
+    generator = PasswordGenerator(12, use_uppercase=False, use_special=False, use_numpy=False)
+    allowed = set(string.ascii_lowercase + string.digits)
+    assert all(set(password) <= allowed for password in generator.generate(500))
+
+
+def test_characters_are_drawn_without_modulo_bias():
+    # 62 characters do not divide 256: the rejected bytes must not favour the first few
+    generator = PasswordGenerator(3, use_special=False)
+    assert generator.limit == 248
+    counts = Counter(generator.random_characters(62 * 2000))
+    assert len(counts) == 62
+    assert max(counts.values()) < 1.25 * min(counts.values())
+
+
+def test_stream_yields_exactly_count():
+    batches = list(PasswordGenerator(16, use_numpy=False).stream(25, batch_size=10))
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+
+
+def test_invalid_options_are_rejected():
+    with pytest.raises(ValueError):
+        PasswordGenerator(8, False, False, False, False)
+    with pytest.raises(ValueError):
+        PasswordGenerator(3)
@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import password_entropy
+
+
+@pytest.fixture(autouse=True)
+def in_temp_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # The compiled dictionary cache is written to the working directory
+
+
+def test_case_folding_that_changes_length_is_scored():
+    # "İ".lower() is two characters; match positions must still fit the password
+    for password in ("İstanbul2020", "İİİİpassword", "p4ssİword"):
+        estimate = password_entropy.estimate(password)
+        assert estimate.bits > 0
+
+
+def test_fold_case_keeps_length():
+    assert password_entropy.fold_case("İstanbul") == "İstanbul"
+    assert password_entropy.fold_case("PassWord") == "password"
+
+
+def test_common_passwords_score_low():
+    assert password_entropy.estimate("password").score == 0
+    assert password_entropy.estimate("Password1").score <= 1
+
+
+def test_longer_random_passwords_score_higher():
+    weak = password_entropy.estimate("qwerty123")
+    strong = password_entropy.estimate("v7#Lq9!zR2m$Tx")
+    assert strong.bits > weak.bits
+    assert strong.score > weak.score
@@ -0,0 +1,89 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import password_journal
+from password_journal import PasswordJournal
+from password_vault import PasswordVault
+
+
+def test_vault_reopens_with_its_records(tmp_path):
+    path = str(tmp_path / "passwords.vault")
+    with PasswordVault(path) as vault:
+        assert vault.extend([(b"one", 1.0), (b"two", 2.0)]) == 1
+        assert vault.append(b"three", 3.0) == 2
+    with PasswordVault(path) as vault:
+        assert len(vault) == 3
+        assert [vault.ciphertext(i) for i in range(3)] == [b"one", b"two", b"three"]
+        assert vault.timestamps() == [1.0, 2.0, 3.0]
+        assert vault.timestamp(-1) == 3.0
+        with pytest.raises(IndexError):
+            vault.ciphertext(3)
+
+
+def test_torn_record_is_truncated_and_index_rebuilt(tmp_path):
+    path = str(tmp_path / "passwords.vault")
+    with PasswordVault(path) as vault:
+        vault.extend([(b"one", 1.0), (b"two", 2.0)])
+    intact = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write(b"\x10\x00\x00\x00partial")  # Crash in the middle of a record
+    os.remove(path + ".idx")
+    with PasswordVault(path) as vault:
+        assert len(vault) == 2
+        assert vault.ciphertext(1) == b"two"
+    assert os.path.getsize(path) == intact
+
+
+def test_legacy_text_vault_is_imported(tmp_path):
+    legacy = tmp_path / "passwords.txt"
+    legacy.write_text("gAAAAone:100.0\ngAAAAtwo:200.0\n")
+    with PasswordVault(str(tmp_path / "passwords.vault"), legacy_path=str(legacy)) as vault:
+        assert [vault.ciphertext(i) for i in range(len(vault))] == [b"gAAAAone", b"gAAAAtwo"]
+        assert vault.timestamps() == [100.0, 200.0]
+
+
+def test_journal_appends_reach_the_vault(tmp_path):
+    path = str(tmp_path / "passwords.vault")
+    with PasswordVault(path) as vault:
+        with PasswordJournal(path + ".journal", vault, interval=0.001) as journal:
+            entries = [journal.append(f"secret{i}".encode(), float(i)) for i in range(100)]
+            assert entries == list(range(100))
+            journal.flush()
+            assert len(vault) == 100
+        assert os.path.getsize(path + ".journal") == password_journal.HEADER.size  # Checkpointed on close
+    with PasswordVault(path) as vault:
+        assert vault.ciphertext(99) == b"secret99"
+
+
+def test_journal_replays_records_missing_from_the_vault(tmp_path):
+    path = str(tmp_path / "passwords.vault")
+    with PasswordVault(path) as vault:
+        vault.append(b"kept", 1.0)
+    # A crash after the journal fsync but before the copy into the vault, with a torn last record
+    with open(path + ".journal", "wb") as f:
+        f.write(password_journal.HEADER.pack(password_journal.MAGIC, password_journal.VERSION, 1))
+        f.write(password_journal.encode_record(b"replayed", 2.0))
+        f.write(password_journal.encode_record(b"torn", 3.0)[:-2])
+    with PasswordVault(path) as vault:
+        journal = PasswordJournal(path + ".journal", vault)
+        assert journal.recovered == 1
+        assert [vault.ciphertext(i) for i in range(len(vault))] == [b"kept", b"replayed"]
+        assert journal.append(b"next", 4.0) == 2
+        journal.close()
+        assert vault.ciphertext(2) == b"next"
+
+
+def test_journal_skips_records_the_vault_already_has(tmp_path):
+    path = str(tmp_path / "passwords.vault")
+    with PasswordVault(path) as vault:
+        vault.extend([(b"a", 1.0), (b"b", 2.0)])
+    with open(path + ".journal", "wb") as f:
+        f.write(password_journal.HEADER.pack(password_journal.MAGIC, password_journal.VERSION, 1))
+        f.write(password_journal.encode_record(b"b", 2.0))  # Already copied before the crash
+    with PasswordVault(path) as vault:
+        PasswordJournal(path + ".journal", vault).close()
+        assert len(vault) == 2
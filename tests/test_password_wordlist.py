@@ -0,0 +1,52 @@
+import math
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import password_wordlist
+
+
+@pytest.fixture
+def wordlist(tmp_path):
+    source = tmp_path / "words.txt"
+    source.write_text("11111 apple\n11112 banana\n11113 t-shirt\n11114 cherry\n11115 yo-yo\n11116 date4\n")
+    with password_wordlist.open_wordlist(str(source)) as wordlist:
+        yield wordlist
+
+
+def test_compiled_wordlist_skips_words_with_digits(wordlist):
+    assert [wordlist[i] for i in range(len(wordlist))] == ["apple", "banana", "t-shirt", "cherry", "yo-yo"]
+
+
+def test_words_containing_a_separator_are_never_picked(wordlist):
+    generator = password_wordlist.PassphraseGenerator(wordlist, words=4, separators="-")
+    for passphrase in generator.generate(200):
+        assert all(word in ("apple", "banana", "cherry") for word in passphrase.split("-"))
+    assert generator.bits == pytest.approx(4 * math.log2(3))
+
+
+def test_separators_must_be_present_and_not_alphanumeric(wordlist):
+    for separators in ("", "a", "-1"):
+        with pytest.raises(ValueError):
+            password_wordlist.PassphraseGenerator(wordlist, separators=separators)
+
+
+def test_digit_block_is_bounded(wordlist):
+    with pytest.raises(ValueError):
+        password_wordlist.PassphraseGenerator(wordlist, digits=password_wordlist.MAX_DIGITS + 1)
+    generator = password_wordlist.PassphraseGenerator(wordlist, words=3, separators="_",
+                                                      digits=password_wordlist.MAX_DIGITS)
+    tokens = generator.generate(1)[0].split("_")
+    assert len(tokens) == 4
+    assert sum(token.isdigit() and len(token) == password_wordlist.MAX_DIGITS for token in tokens) == 1
+
+
+def test_random_below_is_uniform_range():
+    values = password_wordlist.random_below(7, 5000)
+    assert len(values) == 5000
+    assert set(values) == set(range(7))
+    with pytest.raises(ValueError):
+        password_wordlist.random_below(10 ** 25, 1)